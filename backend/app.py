@@ -8,19 +8,17 @@ from flask import Flask, flash, jsonify, render_template, request, redirect, ses
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_cors import CORS
 from dotenv import load_dotenv
-import razorpay
+import requests
 
 # Load environment variables from .env
 load_dotenv()
 
-# Initialize Razorpay Client using env variables
-RAZORPAY_KEY = os.getenv("RAZORPAY_KEY")
-RAZORPAY_SECRET = os.getenv("RAZORPAY_SECRET")
-razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY, RAZORPAY_SECRET))
-
 # Local imports
 from .extensions import db, migrate
 from .models import Cart, Order, OrderItem, CartItem, Product, OTPVerification, User, AdminActionLog, Inventory
+from .utils.cart_service import load_cart_summary
+from .utils.guest_cart import merge_guest_cart
+from .utils.payment_gateway import CB_RESET_SECONDS, GatewayUnavailable
 
 def create_app():
     app = Flask(__name__, template_folder="../templates", static_folder="../static")
@@ -30,11 +28,25 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+    app.config["MAINTENANCE_INTERVAL_SECONDS"] = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "0"))
+    app.config["WEBHOOK_DRAIN_INTERVAL_SECONDS"] = int(os.getenv("WEBHOOK_DRAIN_INTERVAL_SECONDS", "0"))
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
 
+    from .commands import register_commands
+    register_commands(app)
+
+    from .utils.assets import init_assets
+    init_assets(app)
+
+    from .utils.maintenance import init_maintenance
+    init_maintenance(app)
+
+    from .utils.payment_webhooks import init_webhook_worker
+    init_webhook_worker(app)
+
     # Register Blueprints
     from .routes.product_routes import product_bp
     from .routes.cart_routes import cart_bp
@@ -44,6 +56,7 @@ def create_app():
     from .routes.adminroutes import admin_bp
     from backend.routes.payment_routes import payment_bp
     from backend.routes.otp_routes import otp_bp
+    from backend.routes.api import api_bp
 
     app.register_blueprint(product_bp)
     app.register_blueprint(cart_bp)
@@ -53,6 +66,19 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(payment_bp)
     app.register_blueprint(user_bp)
+    app.register_blueprint(api_bp, url_prefix="/api")
+
+    # ---------- PAYMENT GATEWAY ERRORS ----------
+    @app.errorhandler(GatewayUnavailable)
+    def gateway_unavailable(e):
+        response = jsonify({"error": "Payment gateway is temporarily unavailable, please retry shortly"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(CB_RESET_SECONDS)
+        return response
+
+    @app.errorhandler(requests.exceptions.RequestException)
+    def gateway_unreachable(e):
+        return jsonify({"error": "Payment gateway did not respond, please retry"}), 504
 
     # ------------------- ROUTES -------------------
 
@@ -108,6 +134,10 @@ def create_app():
             session["username"] = user.username
             session["profile_pic"] = getattr(user, "profile_pic", None)
 
+            # 🛒 move the cookie cart (if any) into the user's cart in one upsert
+            if merge_guest_cart(user.userid):
+                db.session.commit()
+
             return redirect(url_for("index"))
 
         return render_template("login.html")
@@ -116,32 +146,32 @@ def create_app():
     @app.route("/cart/<int:cart_id>")
     def view_cart(cart_id):
         cart = Cart.query.get_or_404(cart_id)
+        summary = load_cart_summary(cart.cart_id)
         cart_summary = [
             {
-                "name": item.product.name,
-                "price": float(item.product.price),
-                "quantity": item.quantity,
-                "subtotal": float(item.product.price) * item.quantity,
+                "name": line.name,
+                "price": line.unit_price,
+                "quantity": line.quantity,
+                "subtotal": line.subtotal,
             }
-            for item in cart.items
+            for line in summary.lines
         ]
-        total = sum(entry["subtotal"] for entry in cart_summary)
-        return render_template("cart.html", cart=cart, items=cart_summary, total=total)
+        return render_template("cart.html", cart=cart, items=cart_summary, total=summary.total)
 
     @app.route("/checkout/<int:cart_id>")
     def checkout(cart_id):
         cart = Cart.query.get_or_404(cart_id)
+        summary = load_cart_summary(cart.cart_id)
         cart_summary = [
             {
-                "product": item.product.name,
-                "price": float(item.product.price),
-                "quantity": item.quantity,
-                "subtotal": float(item.product.price) * item.quantity,
+                "product": line.name,
+                "price": line.unit_price,
+                "quantity": line.quantity,
+                "subtotal": line.subtotal,
             }
-            for item in cart.items
+            for line in summary.lines
         ]
-        total_amount = sum(entry["subtotal"] for entry in cart_summary)
-        return render_template("checkout.html", cart=cart, summary=cart_summary, total=total_amount)
+        return render_template("checkout.html", cart=cart, summary=cart_summary, total=summary.total)
 
     # ---------- ADMIN REGISTER ----------
     @app.route("/admin/register", methods=["GET", "POST"])
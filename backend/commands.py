@@ -0,0 +1,79 @@
+# backend/commands.py
+import click
+
+from .extensions import db
+
+
+def register_commands(app):
+    """Attach maintenance CLI commands (``flask <command>``) to the app."""
+
+    @app.cli.command("search-index")
+    @click.option("--rebuild", is_flag=True, help="Re-index every existing product.")
+    def search_index(rebuild):
+        """Create (or rebuild) the product full-text search index."""
+        from .utils.search import create_search_index
+
+        with db.engine.begin() as conn:
+            create_search_index(conn, rebuild=rebuild)
+        click.echo("✅ Product search index ready")
+
+    @app.cli.command("related-rebuild")
+    @click.option("--category", "categories", multiple=True, help="Only rebuild these categories.")
+    def related_rebuild(categories):
+        """Recompute the precomputed related-products index."""
+        from .utils.related import rebuild_related_products
+
+        count = rebuild_related_products(categories=list(categories) or None)
+        db.session.commit()
+        click.echo(f"✅ Stored {count} related-product links")
+
+    @app.cli.command("images-ingest")
+    @click.option("--limit", default=500, show_default=True, help="Products per batch (one commit each).")
+    @click.option("--workers", default=8, show_default=True, help="Concurrent fetch/resize threads.")
+    @click.option("--reingest", is_flag=True, help="Also redo products that already have thumbnails.")
+    def images_ingest(limit, workers, reingest):
+        """Fetch product images and build local thumbnails."""
+        from .utils.images import ingest_product_images
+
+        total, failed, last_id = 0, 0, 0
+        while last_id is not None:
+            ingested, failures, last_id = ingest_product_images(
+                limit=limit, workers=workers, reingest=reingest, after_id=last_id
+            )
+            db.session.commit()
+            total += ingested
+            failed += len(failures)
+            for product_id, error in failures:
+                click.echo(f"❌ product {product_id}: {error}")
+        click.echo(f"✅ Ingested {total} images ({failed} failed)")
+
+    @app.cli.command("assets-build")
+    def assets_build():
+        """Build fingerprinted, minified, precompressed CSS/JS into static/dist."""
+        from .utils.assets import build_assets
+
+        manifest = build_assets(app.static_folder)
+        app.extensions["asset_manifest"] = manifest
+        for source, target in manifest.items():
+            click.echo(f"{source} -> {target}")
+        click.echo(f"✅ Built {len(manifest)} assets")
+
+    @app.cli.command("webhooks-drain")
+    @click.option("--batch-size", default=500, show_default=True, help="Events applied per transaction.")
+    def webhooks_drain(batch_size):
+        """Apply queued Razorpay webhook events to orders."""
+        from .utils.payment_webhooks import drain_webhook_events
+
+        processed, paid = drain_webhook_events(chunk_size=batch_size)
+        click.echo(f"✅ Processed {processed} webhook events ({paid} orders paid)")
+
+    @app.cli.command("sweep")
+    @click.option("--chunk-size", default=500, show_default=True, help="Rows deleted per transaction.")
+    @click.option("--pause", default=0.0, show_default=True, help="Seconds to sleep between chunks.")
+    def sweep(chunk_size, pause):
+        """Delete expired OTPs, abandoned carts and other stale rows in small batches."""
+        from .utils.maintenance import run_maintenance
+
+        for name, removed, seconds in run_maintenance(chunk_size=chunk_size, pause=pause):
+            click.echo(f"🧹 {name}: removed {removed} rows in {seconds:.2f}s")
+        click.echo("✅ Sweep complete")
@@ -54,6 +54,10 @@ class AdminActionLog(db.Model):
 # -----------------------
 class Product(db.Model):
     __tablename__ = "product"
+    __table_args__ = (
+        # category filter + price range/ordering on the listing page
+        db.Index("ix_product_category_price", "category", "price"),
+    )
     product_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(100), nullable=True)
@@ -61,7 +65,10 @@ class Product(db.Model):
     stock_qty = db.Column(db.Integer, nullable=False, default=0)
     description = db.Column(db.Text, nullable=True)
     image = db.Column(db.Text, nullable=True)
+    image_key = db.Column(db.String(64), nullable=True)  # sha256 of ingested image -> static/thumbs/
     created_at = db.Column(db.DateTime(), default=datetime.utcnow)
+    # bumped on every change; max(updated_at) is the catalog's cache validator
+    updated_at = db.Column(db.DateTime(), default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # relationships
     cart_items = db.relationship("CartItem", back_populates="product", cascade="all, delete-orphan", lazy=True)
@@ -70,11 +77,30 @@ class Product(db.Model):
     inventory = db.relationship("Inventory", back_populates="product", uselist=False)  
     logs = db.relationship("InventoryLog", back_populates="product", cascade="all, delete-orphan", lazy=True)
 
+
+# -----------------------
+# RelatedProduct (precomputed "you may also like" neighbours)
+# -----------------------
+class RelatedProduct(db.Model):
+    __tablename__ = "related_product"
+    # (product_id, rank) is the primary key, so a detail page reads its
+    # neighbours in order from a single index range scan.
+    product_id = db.Column(db.Integer, db.ForeignKey("product.product_id", ondelete="CASCADE"), primary_key=True)
+    rank = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    related_id = db.Column(db.Integer, db.ForeignKey("product.product_id", ondelete="CASCADE"), nullable=False)
+    score = db.Column(db.Float, nullable=False, default=0)  # price distance, lower = closer
+
+    related = db.relationship("Product", foreign_keys=[related_id])
+
 # -----------------------
 # Cart
 # -----------------------
 class Cart(db.Model):
     __tablename__ = "cart"
+    __table_args__ = (
+        # abandoned-cart sweep: active carts older than the cutoff
+        db.Index("ix_cart_status_created", "status", "created_at"),
+    )
     cart_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.userid"), nullable=False)
     status = db.Column(db.String(20), default="active")
@@ -90,10 +116,15 @@ class Cart(db.Model):
 # -----------------------
 class CartItem(db.Model):
     __tablename__ = "cart_item"
+    __table_args__ = (
+        # one row per product per cart; add-to-cart upserts against it
+        db.UniqueConstraint("cart_id", "product_id", name="uq_cart_item_cart_product"),
+    )
     item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     cart_id = db.Column(db.Integer, db.ForeignKey("cart.cart_id"), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey("product.product_id"), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime(), default=datetime.utcnow, onupdate=datetime.utcnow)
 
     cart = db.relationship("Cart", back_populates="items")
     product = db.relationship("Product", back_populates="cart_items")
@@ -104,14 +135,22 @@ class CartItem(db.Model):
 # -----------------------
 class Order(db.Model):
     __tablename__ = "orders"
+    __table_args__ = (
+        # order history: WHERE user_id = ? ORDER BY created_at DESC, order_id DESC (keyset)
+        db.Index("ix_orders_user_created", "user_id", "created_at", "order_id"),
+        # admin console: newest first, optionally narrowed to one status
+        db.Index("ix_orders_created", "created_at", "order_id"),
+        db.Index("ix_orders_status_created", "order_status", "created_at", "order_id"),
+    )
     order_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.userid"), nullable=False)
     cart_id = db.Column(db.Integer, db.ForeignKey("cart.cart_id"), nullable=True)
     total_amt = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    item_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # units, set at checkout
     payment_method = db.Column(db.String(50), nullable=True)
     order_status = db.Column(db.String(30), default="pending")
     shipping_address = db.Column(db.Text, nullable=True)
-    razorpay_order_id = db.Column(db.String(100), nullable=True)
+    razorpay_order_id = db.Column(db.String(100), nullable=True, index=True)  # webhook + verify lookups
     created_at = db.Column(db.DateTime(), default=datetime.utcnow)
 
     user = db.relationship("User", back_populates="orders")
@@ -146,7 +185,9 @@ class OTPVerification(db.Model):
     otp_code = db.Column(db.String(6), nullable=False)
     is_verified = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime(), default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime(), nullable=False, default=lambda: datetime.utcnow() + timedelta(minutes=5))
+    expires_at = db.Column(db.DateTime(), nullable=False, default=lambda: datetime.utcnow() + timedelta(minutes=5), index=True)
+    delivery_status = db.Column(db.String(20), nullable=True)  # queued / sent / failed (email worker)
+    delivery_attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     user = db.relationship("User", back_populates="otp_entries")
     order = db.relationship("Order", back_populates="otp_verification")
@@ -157,6 +198,10 @@ class OTPVerification(db.Model):
 # -----------------------
 class Inventory(db.Model):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # one stock row per product; reservations update it by product_id
+        db.UniqueConstraint("product_id", name="uq_inventory_product"),
+    )
     inventory_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     product_id = db.Column(db.Integer, db.ForeignKey("product.product_id"), nullable=False)
     stock_quantity = db.Column(db.Integer, nullable=False, default=0)
@@ -182,3 +227,51 @@ class InventoryLog(db.Model):
     timestamp = db.Column(db.DateTime, default=db.func.now())
 
     product = db.relationship("Product", back_populates="logs")
+
+
+# -----------------------
+# StockReservation
+# -----------------------
+class StockReservation(db.Model):
+    __tablename__ = "stock_reservation"
+    __table_args__ = (
+        # expiry sweep: held reservations past expires_at
+        db.Index("ix_stock_reservation_status_expires", "status", "expires_at"),
+    )
+    reservation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.order_id"), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("product.product_id"), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="held")  # held | confirmed | released
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime(), nullable=False)
+
+
+# -----------------------
+# IdempotencyKey
+# -----------------------
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_key"
+    __table_args__ = (
+        db.UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    scope = db.Column(db.String(50), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)  # NULL while the first request is in flight
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow, index=True)
+
+
+# -----------------------
+# Payment Webhook Events
+# -----------------------
+class PaymentWebhookEvent(db.Model):
+    __tablename__ = "payment_webhook_event"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_id = db.Column(db.String(64), nullable=False, unique=True)  # x-razorpay-event-id; redeliveries collide
+    event_type = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    received_at = db.Column(db.DateTime(), default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime(), nullable=True, index=True)  # NULL = still queued
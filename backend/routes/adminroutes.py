@@ -1,10 +1,18 @@
 
 # backend/routes/admin_routes.py
-from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, session, url_for, flash
-from sqlalchemy import func
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, session, url_for, flash, jsonify
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import joinedload
 from backend.extensions import db
-from backend.models import Product, Order, User, Inventory
+from backend.models import Product, Order, User, Inventory, InventoryLog
+from backend.utils.autocomplete import add_product_suggestion
+from backend.utils.facets import invalidate_category_facets
+from backend.utils.inventory_service import adjust_inventory_stock, release_order_reservations
+from backend.utils.pagination import keyset_paginate
+from backend.utils.payment_gateway import gateway_stats
+from backend.utils.product_cache import invalidate_product, product_cache_stats
+from backend.utils.related import refresh_related_for
 from werkzeug.security import generate_password_hash, check_password_hash
 # Blueprint
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin", template_folder="../templates")
@@ -119,6 +127,10 @@ def products():
         )
         db.session.add(new_product)
         db.session.commit()
+        invalidate_category_facets()
+        add_product_suggestion(new_product)
+        refresh_related_for(new_product)
+        db.session.commit()
 
         flash("✅ Product added successfully!", "success")
         return redirect(url_for("admin.products"))
@@ -130,11 +142,123 @@ def products():
 
 
 # ---------- Orders ----------
+ORDER_STATUSES = ["pending", "paid", "confirmed", "payment_review", "shipped", "delivered", "cancelled"]
+# Bulk changes only move orders along these edges; paying an order or
+# cancelling a paid one touches stock and goes through its own flow.
+BULK_TRANSITIONS = {
+    "shipped": ("paid", "confirmed"),
+    "delivered": ("paid", "confirmed", "shipped"),
+    "cancelled": ("pending", "payment_review"),  # their held stock is released
+}
+ORDERS_PER_PAGE = 50
+MAX_BULK_ORDERS = 500
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def _order_filters(args):
+    """Normalized status/date/user filters from a query string or form."""
+    status = args.get("status")
+    return {
+        "status": status if status in ORDER_STATUSES else "",
+        "date_from": args.get("date_from", "") if _parse_day(args.get("date_from")) else "",
+        "date_to": args.get("date_to", "") if _parse_day(args.get("date_to")) else "",
+        "user": (args.get("user") or "").strip(),
+    }
+
+
+def _filtered_orders(filters):
+    # every filter maps onto an index: ix_orders_status_created,
+    # ix_orders_created or ix_orders_user_created
+    query = Order.query
+    if filters["status"]:
+        query = query.filter(Order.order_status == filters["status"])
+    if filters["date_from"]:
+        query = query.filter(Order.created_at >= _parse_day(filters["date_from"]))
+    if filters["date_to"]:
+        query = query.filter(Order.created_at < _parse_day(filters["date_to"]) + timedelta(days=1))
+    if filters["user"]:
+        who = filters["user"]
+        if who.isdigit():
+            query = query.filter(Order.user_id == int(who))
+        else:
+            user_ids = db.session.query(User.userid).filter((User.username == who) | (User.email == who))
+            query = query.filter(Order.user_id.in_(user_ids.scalar_subquery()))
+    return query
+
+
 @admin_bp.route("/orders")
 def orders():
-    from backend.models import Order, User
-    orders = Order.query.all()  # fetch all orders
-    return render_template("orders_admin.html", orders=orders)
+    if not session.get("is_admin"):
+        flash("Admin login required", "danger")
+        return redirect(url_for("admin.login"))
+
+    filters = _order_filters(request.args)
+    # ✅ One page, newest first, with each order's user in the same query;
+    # item counts come from the denormalized Order.item_count
+    pagination = keyset_paginate(
+        _filtered_orders(filters).options(joinedload(Order.user)),
+        [Order.created_at, Order.order_id],
+        after=request.args.get("after"),
+        per_page=ORDERS_PER_PAGE,
+        descending=True,
+    )
+    return render_template(
+        "orders_admin.html",
+        orders=pagination.items,
+        pagination=pagination,
+        filters=filters,
+        statuses=ORDER_STATUSES,
+        bulk_statuses=list(BULK_TRANSITIONS),
+    )
+
+
+@admin_bp.route("/orders/bulk-status", methods=["POST"])
+def bulk_update_order_status():
+    filters = _order_filters(request.form)
+    if not session.get("is_admin"):
+        flash("Admin login required", "danger")
+        return redirect(url_for("admin.login"))
+
+    new_status = request.form.get("new_status")
+    order_ids = {int(i) for i in request.form.getlist("order_ids") if i.isdigit()}
+    if new_status not in BULK_TRANSITIONS:
+        flash("Pick a valid status ❌", "danger")
+    elif not order_ids:
+        flash("No orders selected", "warning")
+    elif len(order_ids) > MAX_BULK_ORDERS:
+        flash(f"Select at most {MAX_BULK_ORDERS} orders at a time", "danger")
+    else:
+        # ✅ One UPDATE for the eligible part of the selection (rows locked so
+        # a payment can't land between the check and the release)
+        eligible = db.session.execute(
+            select(Order.order_id)
+            .where(Order.order_id.in_(order_ids), Order.order_status.in_(BULK_TRANSITIONS[new_status]))
+            .with_for_update()
+        ).scalars().all()
+        if eligible:
+            db.session.execute(
+                update(Order)
+                .where(Order.order_id.in_(eligible))
+                .values(order_status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+            if new_status == "cancelled":
+                release_order_reservations(eligible)
+        db.session.commit()
+        flash(f"{len(eligible)} order(s) marked {new_status} ✅", "success")
+        skipped = len(order_ids) - len(eligible)
+        if skipped:
+            allowed = ", ".join(BULK_TRANSITIONS[new_status])
+            flash(f"{skipped} order(s) skipped: only {allowed} orders can be marked {new_status}", "warning")
+
+    return redirect(url_for("admin.orders", after=request.form.get("after") or None,
+                            **{k: v for k, v in filters.items() if v}))
 
 
 # ---------- Inventory ----------
@@ -154,7 +278,7 @@ def inventory():
             "name": product.name,
             "category": product.category,
             "price": product.price,
-            "stock": inventory.stock if inventory else 0,
+            "stock": inventory.stock_quantity - inventory.reserved_stock if inventory else product.stock_qty,
             "reorder_level": inventory.reorder_level if inventory else "N/A"
         })
 
@@ -168,6 +292,22 @@ def manageinventory():
     return render_template("manageinventory.html")
 
 
+# ---------- Payment gateway health ----------
+@admin_bp.route("/gateway-stats")
+def payment_gateway_stats():
+    if not session.get("is_admin"):
+        return jsonify({"error": "admin only"}), 403
+    return jsonify(gateway_stats())
+
+
+# ---------- Product cache health (this worker's cache) ----------
+@admin_bp.route("/cache-stats")
+def product_cache_health():
+    if not session.get("is_admin"):
+        return jsonify({"error": "admin only"}), 403
+    return jsonify(product_cache_stats())
+
+
 # ---------- Users ----------
 @admin_bp.route("/users")
 def users():
@@ -183,19 +323,21 @@ def restock_product(productid):
     if qty and qty > 0:
         before_qty = product.stock_qty
         product.stock_qty += qty
+        adjust_inventory_stock(product.product_id, qty)
 
         # Add inventory log
-        log = Inventory(
+        log = InventoryLog(
             product_id=product.product_id,
-            changetype="restock",
-            stockbefore=before_qty,
-            stockafter=product.stock_qty,
+            change_type="restock",
+            before=before_qty,
+            after=product.stock_qty,
             reason=f"Restocked {qty} units",
-            createdat=datetime.utcnow()
+            timestamp=datetime.utcnow()
         )
         db.session.add(log)
 
         db.session.commit()
+        invalidate_product(product.product_id)
         flash(f"{qty} units added to {product.name} ✅", "success")
     else:
         flash("Invalid quantity ❌", "danger")
@@ -213,19 +355,21 @@ def adjust_stock(productid):
     if new_qty is not None and new_qty >= 0:
         before_qty = product.stock_qty
         product.stock_qty = new_qty
+        adjust_inventory_stock(product.product_id, new_qty - before_qty)
 
         # Add inventory log
-        log = Inventory(
+        log = InventoryLog(
             product_id=product.product_id,
-            changetype="adjust",
-            stockbefore=before_qty,
-            stockafter=new_qty,
+            change_type="adjust",
+            before=before_qty,
+            after=new_qty,
             reason="Manual stock adjustment",
-            createdat=datetime.utcnow()
+            timestamp=datetime.utcnow()
         )
         db.session.add(log)
 
         db.session.commit()
+        invalidate_product(product.product_id)
         flash(f"Stock adjusted for {product.name} → {new_qty} ✅", "success")
     else:
         flash("Invalid stock quantity ❌", "danger")
@@ -1,28 +1,98 @@
-from decimal import Decimal
-from flask import Blueprint, request, jsonify
-from backend.database import db
-from backend.models import Cart, Order, OrderItem, Product, User
-
-import razorpay
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
+from sqlalchemy import select
+from backend.extensions import db
+from backend.models import Cart, Product, User
+from backend.utils.auth import login_required_json
+from backend.utils.cart_service import to_paise
+from backend.utils.http_cache import conditional_catalog
+from backend.utils.idempotency import idempotent
+from backend.utils.inventory_service import OutOfStock, reserve_stock
+from backend.utils.order_service import (
+    CartConflict,
+    EmptyCart,
+    attach_gateway_order,
+    materialize_order,
+    order_quantities,
+)
+from backend.utils.pagination import keyset_paginate
+from backend.utils.payment_gateway import razorpay_client
 
 api_bp = Blueprint("api", __name__)
 
-# Razorpay client (test mode)
-razorpay_client = razorpay.Client(auth=("rzp_test_xxxxx", "your_secret"))
+
+# Exportable product fields (?fields=id,name,price picks a subset)
+PRODUCT_FIELDS = {
+    "id": Product.product_id,
+    "name": Product.name,
+    "price": Product.price,
+    "description": Product.description,
+    "image": Product.image,
+    "category": Product.category,
+    "stock_qty": Product.stock_qty,
+}
+DEFAULT_PRODUCT_FIELDS = ["id", "name", "price", "description", "image", "category"]
+EXPORT_BATCH_SIZE = 1000
+MAX_PAGE_SIZE = 500
+
+
+def _wants_ndjson():
+    if request.args.get("format") == "ndjson":
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"])
+    return best == "application/x-ndjson"
 
 
-# ✅ GET all products
+# ✅ GET all products (JSON array, or streamed NDJSON with ?format=ndjson);
+#    ?after=<token> switches to cursor pages: {"items", "next", "per_page"[, "total"]}
 @api_bp.route("/products", methods=["GET"])
+@conditional_catalog()
 def get_products():
-    products = Product.query.all()
-    return jsonify([{
-        "id": p.id,
-        "name": p.name,
-        "price": p.price,
-        "description": p.description,
-        "image": p.image,
-        "category": p.category
-    } for p in products]), 200
+    requested = request.args.get("fields")
+    names = [f.strip() for f in requested.split(",") if f.strip()] if requested else DEFAULT_PRODUCT_FIELDS
+    unknown = [f for f in names if f not in PRODUCT_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    # Only the projected columns are selected, never full ORM objects
+    columns = [PRODUCT_FIELDS[f] for f in names]
+    after = request.args.get("after")
+
+    if after is not None and not _wants_ndjson():
+        # cursor mode: WHERE product_id > :last, no OFFSET; the total is
+        # opt-in (?count=exact) or a planner estimate (?count=estimate)
+        per_page = min(request.args.get("per_page", 50, type=int) or 50, MAX_PAGE_SIZE)
+        count = request.args.get("count")
+        page = keyset_paginate(
+            db.session.query(Product.product_id, *columns),
+            [Product.product_id],
+            after=after,
+            per_page=per_page,
+            count=count if count in ("exact", "estimate") else None,
+        )
+        body = {
+            "per_page": per_page,
+            "next": page.next_cursor,
+            "items": [dict(zip(names, row[1:])) for row in page.items],
+        }
+        if page.total is not None:
+            body["total"] = page.total
+        return jsonify(body), 200
+
+    stmt = select(*columns).order_by(Product.product_id)
+
+    if not _wants_ndjson():
+        rows = db.session.execute(stmt)
+        return jsonify([dict(zip(names, row)) for row in rows]), 200
+
+    def generate():
+        # yield_per streams from a server-side cursor: memory stays at one
+        # batch no matter how large the catalog is
+        dumps = current_app.json.dumps
+        rows = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in rows:
+            yield dumps(dict(zip(names, row))) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 
 # ✅ Register new user
@@ -42,46 +112,43 @@ def register_user():
 # ✅ Checkout with Razorpay (sum of cart items)
 # ✅ Checkout with Razorpay (old /checkout route)
 @api_bp.route("/checkout", methods=["POST"])
+@login_required_json
+@idempotent("api.checkout")
 def checkout_cart():
-    data = request.json
-    user_id = data.get("user_id")
+    user_id = session["user_id"]  # never trust a user_id from the body
 
     cart = Cart.query.filter_by(user_id=user_id, status="active").first()
-    if not cart or not cart.items:
+    if not cart:
         return jsonify({"error": "Cart is empty"}), 400
 
-    total_amount = sum(item.quantity * float(item.product.price) for item in cart.items)
-    amount_in_paise = int(total_amount * 100)
-
-    razorpay_order = razorpay_client.order.create({
+    # order + items + cart flip + stock hold in one transaction, committed
+    # before the Razorpay call so no inventory row stays locked across it
+    try:
+        new_order = materialize_order(
+            cart.cart_id, user_id, payment_method="razorpay", order_status="pending"
+        )
+        reserve_stock(new_order.order_id, order_quantities(new_order.order_id))
+    except EmptyCart:
+        db.session.rollback()
+        return jsonify({"error": "Cart is empty"}), 400
+    except CartConflict as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 409
+    except OutOfStock as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "product_id": e.product_id}), 409
+
+    order_id = new_order.order_id
+    amount_in_paise = to_paise(new_order.total_amt)
+    razorpay_order = attach_gateway_order(order_id, lambda: razorpay_client.order.create({
         "amount": amount_in_paise,
         "currency": "INR",
         "payment_capture": 1
-    })
-
-    new_order = Order(
-        user_id=user_id,
-        cart_id=cart.cart_id,
-        total_amt=total_amount,
-        payment_method="razorpay",
-        order_status="pending"
-    )
-    db.session.add(new_order)
-    db.session.commit()
-
-    for item in cart.items:
-        order_item = OrderItem(
-            order_id=new_order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            unit_price=item.product.price
-        )
-        db.session.add(order_item)
-    db.session.commit()
+    }))
 
     return jsonify({
         "razorpay_order_id": razorpay_order["id"],
-        "db_order_id": new_order.id,
+        "db_order_id": order_id,
         "amount": amount_in_paise,
         "currency": "INR"
     })
@@ -89,35 +156,44 @@ def checkout_cart():
 
 # ✅ Another checkout route (/orders/checkout)
 @api_bp.route("/orders/checkout", methods=["POST"])
+@login_required_json
+@idempotent("api.orders_checkout")
 def checkout_with_address():
-    data = request.json
-    user_id = data.get("user_id")
+    data = request.get_json(silent=True) or {}
+    user_id = session["user_id"]  # never trust a user_id from the body
 
     cart = Cart.query.filter_by(user_id=user_id, status="active").first()
-    if not cart or not cart.items:
+    if not cart:
         return jsonify({"error": "Cart is empty"}), 400
 
-    total_amount = sum(float(item.quantity) * float(item.product.price) for item in cart.items)
-
-    razorpay_order = razorpay_client.order.create({
-        "amount": int(total_amount * 100),
+    try:
+        order = materialize_order(
+            cart.cart_id,
+            user_id,
+            payment_method="razorpay",
+            order_status="pending",
+            shipping_address=data.get("shipping_address"),
+        )
+        reserve_stock(order.order_id, order_quantities(order.order_id))
+    except EmptyCart:
+        db.session.rollback()
+        return jsonify({"error": "Cart is empty"}), 400
+    except CartConflict as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 409
+    except OutOfStock as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "product_id": e.product_id}), 409
+
+    total_amount = order.total_amt
+    razorpay_order = attach_gateway_order(order.order_id, lambda: razorpay_client.order.create({
+        "amount": to_paise(total_amount),
         "currency": "INR",
         "payment_capture": "1"
-    })
-
-    order = Order(
-        user_id=user_id,
-        cart_id=cart.cart_id,
-        total_amt=Decimal(total_amount),
-        payment_method="razorpay",
-        order_status="pending",
-        shipping_address=data.get("shipping_address")
-    )
-    db.session.add(order)
-    db.session.commit()
+    }))
 
     return jsonify({
         "razorpay_order_id": razorpay_order["id"],
-        "amount": total_amount,
+        "amount": float(total_amount),
         "currency": "INR"
     })
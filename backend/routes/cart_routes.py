@@ -1,7 +1,22 @@
 from flask import Blueprint, render_template, redirect, url_for, request, session, flash, jsonify
-from ..models import Product, Cart, CartItem, User
+from ..models import CartItem, Product, User
 from ..extensions import db
-from datetime import datetime
+from ..utils.cart_service import (
+    active_cart_summary,
+    apply_cart_operations,
+    fold_cart_operations,
+    get_or_create_active_cart,
+    load_cart_summary,
+    upsert_cart_item,
+)
+from ..utils.guest_cart import (
+    MAX_LINE_QUANTITY,
+    add_guest_item,
+    guest_cart_summary,
+    read_guest_cart,
+    save_guest_cart,
+)
+from ..utils.product_cache import get_product_record_or_404
 
 cart_bp = Blueprint("cart", __name__, url_prefix="/cart")
 
@@ -14,72 +29,62 @@ def get_user_from_session():
 
 # 🔑 Helper: Get or create active cart
 def get_or_create_cart(user):
-    cart = Cart.query.filter_by(user_id=user.userid, status="active").first()
-    if not cart:
-        cart = Cart(user_id=user.userid, status="active", created_at=datetime.utcnow())
-        db.session.add(cart)
-        db.session.commit()
-    return cart
+    return get_or_create_active_cart(user.userid)
 
 
-# 🛒 View Cart
+# 🛒 View Cart (DB cart for users, signed cookie for guests)
 @cart_bp.route("/")
 def view_cart():
     user = get_user_from_session()
-    if not user:
-        flash("You must log in to view your cart.", "warning")
-        return redirect(url_for("auth.login"))
-
-    cart = Cart.query.filter_by(user_id=user.userid, status="active").first()
+    summary = active_cart_summary(user.userid) if user else guest_cart_summary(read_guest_cart())
     items = []
     total = 0
 
-    if cart:
-        for item in cart.items:
-            subtotal = item.quantity * (item.product.price or 0)
-            total += subtotal
+    if summary:
+        total = summary.total
+        for line in summary.lines:
             items.append({
-                "id": item.item_id,
-                "product_id": item.product.product_id,
-                "title": item.product.name,
-                "price": item.product.price,
-                "quantity": item.quantity,
-                "subtotal": subtotal,
+                "id": line.item_id,
+                "product_id": line.product_id,
+                "title": line.name,
+                "name": line.name,
+                "image_url": line.image,
+                "price": line.unit_price,
+                "quantity": line.quantity,
+                "subtotal": line.subtotal,
             })
 
-    return render_template("cart.html", items=items, total=total)
+    return render_template("cart.html", items=items, total=total, guest=user is None)
 
 
 # 🛒 Add to Cart
 @cart_bp.route("/add/<int:product_id>", methods=["POST"])
 def add_to_cart(product_id):
     user = get_user_from_session()
-    if not user:
-        flash("Please log in first!", "warning")
-        return redirect(url_for("auth.login"))
-
     qty = int(request.form.get("quantity", 1))
-    product = Product.query.get_or_404(product_id)
-    cart = get_or_create_cart(user)
+    product = get_product_record_or_404(product_id)
 
-    item = CartItem.query.filter_by(cart_id=cart.cart_id, product_id=product_id).first()
-    if item:
-        item.quantity += qty
-    else:
-        item = CartItem(cart_id=cart.cart_id, product_id=product_id, quantity=qty)
-        db.session.add(item)
+    if not user:
+        flash(f"{product.name} added to cart!", "success")
+        response = redirect(url_for("cart.view_cart"))
+        return save_guest_cart(response, add_guest_item(read_guest_cart(), product_id, qty))
 
+    cart = get_or_create_cart(user)
+    upsert_cart_item(cart.cart_id, product_id, qty)
     db.session.commit()
     flash(f"{product.name} added to cart!", "success")
     return redirect(url_for("cart.view_cart"))
 
 
-# ❌ Remove Item
+# ❌ Remove Item (guests: item_id is the product_id)
 @cart_bp.route("/remove/<int:item_id>", methods=["POST"])
 def remove_item(item_id):
     user = get_user_from_session()
     if not user:
-        return redirect(url_for("auth.login"))
+        lines = read_guest_cart()
+        lines.pop(item_id, None)
+        flash("Item removed from cart.", "info")
+        return save_guest_cart(redirect(url_for("cart.view_cart")), lines)
 
     cart = get_or_create_cart(user)
     item = CartItem.query.filter_by(item_id=item_id, cart_id=cart.cart_id).first_or_404()
@@ -96,21 +101,72 @@ def remove_item(item_id):
 def api_add():
     data = request.get_json() or {}
     user = get_user_from_session()
-    if not user:
-        return jsonify({"error": "auth required"}), 401
 
     product_id = int(data.get("product_id"))
     qty = int(data.get("quantity", 1))
 
-    product = Product.query.get_or_404(product_id)
-    cart = get_or_create_cart(user)
+    product = get_product_record_or_404(product_id)
 
-    item = CartItem.query.filter_by(cart_id=cart.cart_id, product_id=product_id).first()
-    if item:
-        item.quantity += qty
-    else:
-        item = CartItem(cart_id=cart.cart_id, product_id=product_id, quantity=qty)
-        db.session.add(item)
+    if not user:
+        response = jsonify({"message": f"{product.name} added to cart!", "cart_id": None, "guest": True})
+        return save_guest_cart(response, add_guest_item(read_guest_cart(), product_id, qty))
 
+    cart = get_or_create_cart(user)
+    upsert_cart_item(cart.cart_id, product_id, qty)
     db.session.commit()
     return jsonify({"message": f"{product.name} added to cart!", "cart_id": cart.cart_id})
+
+
+# 📦 JSON API: many add/set/remove operations in one request and one transaction
+@cart_bp.route("/api/batch", methods=["POST"])
+def api_batch():
+    data = request.get_json(silent=True)
+    operations = data.get("operations") if isinstance(data, dict) else data
+    try:
+        adds, sets, removes = fold_cart_operations(operations)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    wanted = set(adds) | set(sets)
+    if wanted:
+        found = {pid for (pid,) in db.session.query(Product.product_id).filter(Product.product_id.in_(wanted))}
+        missing = sorted(wanted - found)
+        if missing:
+            return jsonify({"error": "unknown products", "product_ids": missing}), 404
+
+    user = get_user_from_session()
+    if not user:
+        lines = read_guest_cart()
+        for pid in removes:
+            lines.pop(pid, None)
+        for pid, qty in sets.items():
+            lines[pid] = min(qty, MAX_LINE_QUANTITY)
+        for pid, qty in adds.items():
+            lines = add_guest_item(lines, pid, qty)
+        response = jsonify(_summary_json(guest_cart_summary(lines), guest=True))
+        return save_guest_cart(response, lines)
+
+    cart = get_or_create_cart(user)
+    apply_cart_operations(cart.cart_id, adds, sets, removes)
+    db.session.commit()
+    return jsonify(_summary_json(load_cart_summary(cart.cart_id)))
+
+
+def _summary_json(summary, guest=False):
+    return {
+        "cart_id": summary.cart_id,
+        "guest": guest,
+        "items": [
+            {
+                "id": line.item_id,
+                "product_id": line.product_id,
+                "name": line.name,
+                "price": float(line.unit_price),
+                "quantity": line.quantity,
+                "subtotal": float(line.subtotal),
+            }
+            for line in summary.lines
+        ],
+        "item_count": summary.item_count,
+        "total": float(summary.total),
+    }
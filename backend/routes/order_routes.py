@@ -1,57 +1,72 @@
-from datetime import datetime
-import razorpay
 from flask import Blueprint, flash, redirect, request, jsonify, render_template, session, url_for
 from ..extensions import db
 from ..models import Cart, Order, OrderItem, Product, User
+from ..utils.auth import login_required_json
+from ..utils.cart_service import to_paise
+from ..utils.guest_cart import merge_guest_cart, read_guest_cart
+from ..utils.idempotency import idempotent
+from ..utils.inventory_service import OutOfStock, confirm_reservations, reserve_stock
+from ..utils.order_service import (
+    CartConflict,
+    EmptyCart,
+    attach_gateway_order,
+    materialize_order,
+    order_quantities,
+)
+from ..utils.pagination import keyset_paginate
+from ..utils.product_cache import invalidate_product
+from ..utils.payment_gateway import razorpay_client
 
 order_bp = Blueprint("order", __name__, url_prefix="/orders")
 
-# Razorpay client (use your test keys)
-razorpay_client = razorpay.Client(auth=("YOUR_KEY_ID", "YOUR_KEY_SECRET"))
-
 
 @order_bp.route("/place", methods=["POST"])
+@login_required_json
+@idempotent("order.place")
 def place_order():
-    data = request.get_json()
-    name = data.get("name")
-    address = data.get("address")
-    phone = data.get("phone")
-    user_id = session.get("user_id") or 1  # demo fallback
-
-    # For demo: calculate total from cart/products
-    products = Product.query.limit(1).all()  # TODO: fetch from cart
-    if not products:
-        return jsonify({"error": "No products"}), 400
-
-    total_amt = sum(p.price for p in products)
-
-    # Create Order in DB (status=pending)
-    order = Order(
-        user_id=user_id,
-        name=name,
-        address=address,
-        phone=phone,
-        total_amt=total_amt,
-        status="pending",
+    data = request.get_json(silent=True) or {}
+    user_id = session["user_id"]
+    shipping_address = "\n".join(
+        str(data[field]).strip() for field in ("name", "address", "phone") if data.get(field)
     )
-    db.session.add(order)
-    db.session.commit()
 
-    # Create Razorpay Order
-    razorpay_order = razorpay_client.order.create(
-        dict(amount=int(total_amt * 100), currency="INR", payment_capture="1")
+    cart = Cart.query.filter_by(user_id=user_id, status="active").first()
+    if not cart:
+        return jsonify({"error": "Cart is empty"}), 400
+
+    # ✅ Order (status=pending) from the cart, with a stock hold, in one transaction
+    try:
+        order = materialize_order(
+            cart.cart_id,
+            user_id,
+            payment_method="razorpay",
+            order_status="pending",
+            shipping_address=shipping_address or None,
+        )
+        reserve_stock(order.order_id, order_quantities(order.order_id))
+    except EmptyCart:
+        db.session.rollback()
+        return jsonify({"error": "Cart is empty"}), 400
+    except (CartConflict, OutOfStock) as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 409
+
+    # Create Razorpay Order (after the commit: no row locks across the HTTP call)
+    order_id, total_amt = order.order_id, order.total_amt
+    razorpay_order = attach_gateway_order(
+        order_id,
+        lambda: razorpay_client.order.create(dict(amount=to_paise(total_amt), currency="INR", payment_capture="1")),
     )
 
     return jsonify(
         {
-            "order_id": order.id,
+            "order_id": order_id,
             "razorpay_order_id": razorpay_order["id"],
-            "total_amt": total_amt,
+            "total_amt": float(total_amt),
         }
     )
 
 
-
 @order_bp.route("/success", methods=["POST"])
 def payment_success():
     data = request.get_json()
@@ -71,6 +86,13 @@ def payment_success():
 
 @order_bp.route("/checkout")
 def checkout():
+    user_id = session.get("user_id")
+    if not user_id:
+        if read_guest_cart():
+            flash("Please log in to checkout — your cart will be kept.", "warning")
+            return redirect(url_for("login"))
+    elif merge_guest_cart(user_id):
+        db.session.commit()
     return render_template("checkout.html")
 
 @order_bp.route("/place_order", methods=["GET", "POST"])
@@ -82,47 +104,36 @@ def user_place_order():
     user = User.query.get(session["user_id"])
 
     if request.method == "POST":
-        try:
-            # ✅ Get cart items of the user
-            cart_items = Cart.query.filter_by(user_id=user.user_id).all()
-            if not cart_items:
-                flash("Your cart is empty!", "danger")
-                return redirect(url_for("cart.view_cart"))
-
-            # ✅ Create a new Order
-            new_order = Order(
-                user_id=user.user_id,
-                status="Paid",   # since you said paid orders
-                created_at=datetime.utcnow()
-            )
-            db.session.add(new_order)
-            db.session.commit()
-
-            # ✅ Move cart items to order items
-            for item in cart_items:
-                order_item = OrderItem(
-                    order_id=new_order.order_id,
-                    product_id=item.product_id,
-                    quantity=item.quantity,
-                    price=item.product.price
-                )
-                db.session.add(order_item)
-                db.session.delete(item)  # clear from cart
+        cart = Cart.query.filter_by(user_id=user.userid, status="active").first()
+        if not cart:
+            flash("Your cart is empty!", "danger")
+            return redirect(url_for("cart.view_cart"))
 
+        # ✅ Cart -> order in one transaction (bulk copy of lines, one commit)
+        try:
+            new_order = materialize_order(cart.cart_id, user.userid, order_status="paid")  # paid orders
+            quantities = order_quantities(new_order.order_id)
+            reserve_stock(new_order.order_id, quantities)
+            confirm_reservations(new_order.order_id)
             db.session.commit()
-
-            flash("Order placed successfully!", "success")
-            return redirect(url_for("user.dashboard"))
-
-        except Exception as e:
+            for product_id in quantities:
+                invalidate_product(product_id)
+        except EmptyCart:
+            db.session.rollback()
+            flash("Your cart is empty!", "danger")
+            return redirect(url_for("cart.view_cart"))
+        except (CartConflict, OutOfStock) as e:
             db.session.rollback()
             flash(f"Error placing order: {str(e)}", "danger")
             return redirect(url_for("cart.view_cart"))
 
+        flash("Order placed successfully!", "success")
+        return redirect(url_for("user.dashboard"))
+
     # ===================
     # GET request → show order page
     # ===================
-    cart_items = Cart.query.filter_by(user_id=user.user_id).all()
+    cart_items = Cart.query.filter_by(user_id=user.userid).all()
     return render_template("place_order.html", user=user, cart_items=cart_items)
 
 
@@ -131,10 +142,34 @@ def user_place_order():
 # ======================
 
 
+ORDERS_PER_PAGE = 20
+
+
 @order_bp.route("/orders", methods=["GET"])
 def view_orders():
     if not session.get("user_id"):
-        return redirect(url_for("auth.login"))   # or wherever your login page is
-
-    orders = Order.query.filter_by(user_id=session["user_id"]).order_by(Order.created_at.desc()).all()
-    return render_template("orders.html", orders=orders)
\ No newline at end of file
+        return redirect(url_for("login"))
+
+    # ✅ Keyset page over ix_orders_user_created: newest first, same cost for every page
+    pagination = keyset_paginate(
+        Order.query.filter_by(user_id=session["user_id"]),
+        [Order.created_at, Order.order_id],
+        after=request.args.get("after"),
+        per_page=ORDERS_PER_PAGE,
+        descending=True,
+    )
+    orders = pagination.items
+
+    # ✅ Lines for the whole page in one query instead of one per order
+    lines = {order.order_id: [] for order in orders}
+    if lines:
+        rows = (
+            db.session.query(OrderItem.order_id, Product.name, OrderItem.quantity, OrderItem.unit_price)
+            .join(Product, Product.product_id == OrderItem.product_id)
+            .filter(OrderItem.order_id.in_(lines))
+            .order_by(OrderItem.order_id, OrderItem.id)
+        )
+        for order_id, name, quantity, unit_price in rows:
+            lines[order_id].append({"name": name, "quantity": quantity, "unit_price": unit_price})
+
+    return render_template("orders.html", orders=orders, lines=lines, pagination=pagination)
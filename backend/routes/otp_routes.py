@@ -1,14 +1,10 @@
 # backend/routes/otp_routes.py
-import os
 import random
-import requests
 from datetime import datetime, timedelta
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session
 from backend.models import Cart, OTPVerification, OrderItem, Product, User, Order
 from backend.extensions import db
-from dotenv import load_dotenv
-
-load_dotenv()
+from backend.utils.otp_mailer import enqueue_otp_email, mailer_configured
 
 otp_bp = Blueprint("otp", __name__)
 
@@ -18,37 +14,6 @@ def generate_otp():
     return str(random.randint(100000, 999999)).zfill(6)
 
 
-# ====== Resend API Email Sender ======
-RESEND_API_KEY = os.getenv("RESEND_API_KEY")
-
-def send_otp_email(to_email, otp):
-    """Send OTP email using Resend API."""
-    if not RESEND_API_KEY:
-        print("❌ RESEND_API_KEY not found in environment variables.")
-        return False
-
-    url = "https://api.resend.com/emails"
-    headers = {
-        "Authorization": f"Bearer {RESEND_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    data = {
-        "from": "Resend <onboarding@resend.dev>",
-        "to": [to_email],
-        "subject": "Your OTP Code",
-        "html": f"<h2>Your OTP is {otp}</h2><p>This code will expire in 5 minutes.</p>",
-    }
-
-    try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        print(f"✅ OTP email sent to {to_email}")
-        return True
-    except Exception as e:
-        print(f"❌ Failed to send OTP via Resend API: {e}")
-        return False
-
-
 # ====== Routes ======
 @otp_bp.route("/resend-otp", methods=["POST"])
 def resend_otp():
@@ -68,10 +33,18 @@ def resend_otp():
         if not final_email:
             return jsonify({"status": "error", "message": "Email not found"}), 400
 
+        if not mailer_configured():
+            current_app.logger.error("RESEND_API_KEY not found in environment variables")
+            return jsonify({
+                "status": "error",
+                "message": "Failed to send OTP email. Please try again later."
+            }), 500
+
         otp_code = generate_otp()
         expiry_time = datetime.utcnow() + timedelta(minutes=5)
 
         # Store OTP in DB
+        otp_entry = None
         if user_id:
             otp_entry = OTPVerification(
                 user_id=user_id,
@@ -79,17 +52,14 @@ def resend_otp():
                 otp_code=otp_code,
                 is_verified=False,
                 created_at=datetime.utcnow(),
-                expires_at=expiry_time
+                expires_at=expiry_time,
+                delivery_status="queued"
             )
             db.session.add(otp_entry)
             db.session.commit()
 
-        # Send OTP via Resend API
-        if not send_otp_email(final_email, otp_code):
-            return jsonify({
-                "status": "error",
-                "message": "Failed to send OTP email. Please try again later."
-            }), 500
+        # Email goes out from the background queue; no remote call in the request
+        enqueue_otp_email(final_email, otp_code, otp_entry.id if otp_entry else None)
 
         return jsonify({
             "status": "success",
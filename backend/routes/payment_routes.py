@@ -1,63 +1,60 @@
 # backend/routes/payment_routes.py
-import os
-import razorpay
 from datetime import datetime
 from flask import Blueprint, request, jsonify, session
-from backend.models import Cart, Order, db
-from dotenv import load_dotenv
+from razorpay.errors import BadRequestError, SignatureVerificationError
+from backend.models import Order, db
+from backend.utils.cart_service import active_cart_summary, to_paise
+from backend.utils.idempotency import idempotent
+from backend.utils.inventory_service import OutOfStock, confirm_order_stock
+from backend.utils.payment_gateway import RAZORPAY_KEY, RAZORPAY_WEBHOOK_SECRET, razorpay_client
+from backend.utils.payment_webhooks import enqueue_webhook_event, notify_webhook_worker
+from backend.utils.product_cache import invalidate_product
+from sqlalchemy import update
 from .api import api_bp
-load_dotenv()
-
-# ===== Razorpay config =====
-RAZORPAY_KEY = os.getenv("RAZORPAY_KEY", "rzp_test_RH6n0VjLPp4cd7")
-RAZORPAY_SECRET = os.getenv("RAZORPAY_SECRET", "ei5ZQbwEyJ8nsPE86a71AHeD")
-razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY, RAZORPAY_SECRET))
 
 payment_bp = Blueprint("payment", __name__, url_prefix="/payment")
 
 # ===== Create Razorpay Order =====
 @payment_bp.route("/create-order", methods=["POST"])
+@idempotent("payment.create_order")
 def create_order():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     shipping_address = data.get("shipping_address", "")
 
-    try:
-        # 🔹 Get current user's active cart
-        user_id = session.get("user_id")
-        cart = Cart.query.filter_by(user_id=user_id, status="active").first()
-
-        if not cart or not cart.items:
-            return jsonify({"status": "error", "message": "Cart is empty"}), 400
+    # 🔹 Get current user's active cart
+    user_id = session.get("user_id")
+    summary = active_cart_summary(user_id)
 
-        # 🔹 Calculate total (paise for Razorpay)
-        total_amount = 0
-        for item in cart.items:  
-            total_amount += float(item.product.price) * item.quantity  
+    if not summary or not summary.lines:
+        return jsonify({"status": "error", "message": "Cart is empty"}), 400
 
-        order_amount = int(total_amount * 100)  # convert ₹ to paise
-        order_currency = "INR"
-        order_receipt = f"order_rcptid_{datetime.now().timestamp()}"
+    # 🔹 Total in paise for Razorpay (exact Decimal math, one query for all lines)
+    order_amount = to_paise(summary.total)
+    order_currency = "INR"
+    order_receipt = f"order_rcptid_{datetime.now().timestamp()}"
 
-        # 🔹 Create Razorpay order
+    # 🔹 Create Razorpay order. Only a rejected request is answered here;
+    # GatewayUnavailable / timeouts reach the app-level 503/504 handlers and
+    # server errors stay 5xx, so @idempotent releases the key for a retry.
+    try:
         razorpay_order = razorpay_client.order.create({
             "amount": order_amount,
             "currency": order_currency,
             "receipt": order_receipt,
             "payment_capture": 1
         })
-
-        return jsonify({
-            "status": "success",
-            "order_id": order_receipt,
-            "razorpay_order_id": razorpay_order["id"],
-            "amount": order_amount,
-            "currency": order_currency,
-            "key": RAZORPAY_KEY
-        })
-
-    except Exception as e:
+    except BadRequestError as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
+    return jsonify({
+        "status": "success",
+        "order_id": order_receipt,
+        "razorpay_order_id": razorpay_order["id"],
+        "amount": order_amount,
+        "currency": order_currency,
+        "key": RAZORPAY_KEY
+    })
+
 
 
 # ===== Verify Razorpay Payment =====
@@ -80,14 +77,56 @@ def verify_payment():
         }
         razorpay_client.utility.verify_payment_signature(params_dict)
 
-        # 🔹 Update order status in DB
+        # 🔹 Update order status in DB (the webhook may have got there first)
         order = Order.query.filter_by(razorpay_order_id=razorpay_order_id).first()
         if order:
             order.payment_id = razorpay_payment_id
-            order.order_status = "paid"
-            db.session.commit()
+            claimed = db.session.execute(
+                update(Order)
+                .where(Order.order_id == order.order_id, Order.order_status == "pending")
+                .values(order_status="paid")
+                .execution_options(synchronize_session="fetch")
+            ).rowcount
+            if claimed:
+                try:
+                    sold = confirm_order_stock(order.order_id)  # held stock becomes a sale
+                except OutOfStock:
+                    # the hold expired and the stock sold meanwhile: refund, don't oversell
+                    order.order_status = "payment_review"
+                    db.session.commit()
+                    return jsonify({
+                        "status": "error",
+                        "message": "Payment received, but some items sold out. We will refund you shortly."
+                    }), 409
+                db.session.commit()
+                for product_id in sold:
+                    invalidate_product(product_id)
 
         return jsonify({"status": "success", "message": "Payment verified"})
 
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
+
+
+# ===== Razorpay Webhook =====
+@payment_bp.route("/webhook", methods=["POST"])
+def razorpay_webhook():
+    # 🔹 Verify, queue and acknowledge; orders are updated by the drainer
+    if not RAZORPAY_WEBHOOK_SECRET:
+        return jsonify({"status": "error", "message": "Webhook secret not configured"}), 503
+
+    body = request.get_data(as_text=True)
+    signature = request.headers.get("X-Razorpay-Signature", "")
+    try:
+        razorpay_client.utility.verify_webhook_signature(body, signature, RAZORPAY_WEBHOOK_SECRET)
+    except SignatureVerificationError:
+        return jsonify({"status": "error", "message": "Invalid signature"}), 400
+
+    try:
+        queued = enqueue_webhook_event(body, request.headers.get("X-Razorpay-Event-Id"))
+    except ValueError:
+        return jsonify({"status": "error", "message": "Malformed event"}), 400
+    db.session.commit()
+    if queued:
+        notify_webhook_worker()
+    return jsonify({"status": "ok", "duplicate": not queued})
@@ -1,53 +1,91 @@
 # backend/routes/product_routes.py
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, current_app, render_template, request, jsonify, session
 from backend.models import Product, Cart, User, db
+from backend.utils.autocomplete import ensure_suggestion_index
+from backend.utils.facets import category_facets, price_histogram
+from backend.utils.fragments import render_product_card
+from backend.utils.http_cache import conditional_catalog
+from backend.utils.images import product_image_url
+from backend.utils.pagination import keyset_paginate
+from backend.utils.product_cache import get_product_record_or_404
+from backend.utils.related import related_products_for
+from backend.utils.search import apply_product_search
 import razorpay
 
 # ------------------ PRODUCT ROUTES ------------------
 product_bp = Blueprint("product", __name__, url_prefix="/products")
+product_bp.add_app_template_global(render_product_card, "product_card")
+product_bp.add_app_template_global(product_image_url, "product_image")
 
 @product_bp.route("/", methods=["GET"])
+@conditional_catalog()
 def products():
     search_query = request.args.get("q", "").strip()
     selected_category = request.args.get("category", "").strip()
+    min_price = request.args.get("min_price", type=float)
+    max_price = request.args.get("max_price", type=float)
+    price_lt = request.args.get("price_lt", type=float)  # exclusive upper bound (histogram buckets)
     page = request.args.get("page", 1, type=int)
+    after = request.args.get("after")  # keyset cursors, used when not searching
+    before = request.args.get("before")
     per_page = 8  # products per page
 
     query = Product.query
 
-    # Search filter
+    # Search filter (full-text index, relevance ranked)
     if search_query:
-        query = query.filter(Product.title.ilike(f"%{search_query}%"))
+        query = apply_product_search(query, search_query)
 
     # Category filter
     if selected_category:
         query = query.filter(Product.category == selected_category)
 
-    # ✅ Pagination
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Price range filter (served by the (category, price) index)
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+    if price_lt is not None:
+        query = query.filter(Product.price < price_lt)
+
+    # ✅ Pagination: browsing is keyset on product_id (no OFFSET, no COUNT);
+    # relevance-ranked search results keep numbered pages.
+    if not search_query:
+        pagination = keyset_paginate(query, [Product.product_id], after=after, before=before, per_page=per_page)
+    else:
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     products = pagination.items
 
-    # Fetch all categories for dropdown
-    categories = [c[0] for c in db.session.query(Product.category).distinct().all()]
+    # Categories (with counts for the current search) for the dropdown, cached
+    categories = category_facets(search_query)
+    price_buckets = price_histogram(search_query, selected_category)
 
     return render_template(
         "products.html",
         products=products,
         pagination=pagination,
         categories=categories,
+        price_buckets=price_buckets,
         selected_category=selected_category,
         search_query=search_query,
+        min_price=min_price,
+        max_price=max_price,
+        price_lt=price_lt,
     )
 
 @product_bp.route("/<int:product_id>")
+@conditional_catalog()
 def product_detail(product_id):
-    product = Product.query.get_or_404(product_id)
+    product = get_product_record_or_404(product_id)
 
-    # ✅ Related products (exclude the same product)
-    related_products = Product.query.filter(
-        Product.category == product.category,
-        Product.product_id != product.product_id
-    ).limit(4).all()
+    # ✅ Related products from the precomputed index (same category, closest price)
+    related_products = related_products_for(product)
+    if not related_products:
+        # Index not built yet for this product: fall back to any same-category items
+        related_products = Product.query.filter(
+            Product.category == product.category,
+            Product.product_id != product.product_id
+        ).limit(4).all()
 
     return render_template(
         "product_detail.html",
@@ -56,4 +94,10 @@ def product_detail(product_id):
     )
 
 
-
+@product_bp.route("/suggest")
+def suggest():
+    """Autocomplete for the search box: served from memory, no DB query."""
+    prefix = request.args.get("q", "")
+    limit = max(1, min(request.args.get("limit", 8, type=int), 20))
+    index = ensure_suggestion_index(current_app._get_current_object())
+    return jsonify({"query": prefix, "suggestions": index.search(prefix, limit)})
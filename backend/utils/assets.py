@@ -0,0 +1,132 @@
+# backend/utils/assets.py
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz siblings are produced
+    brotli = None
+
+# ====== Fingerprinted static assets ======
+# `flask assets-build` minifies static/css/*.css and static/js/*.js into
+# static/dist/ under content-hashed names (style.3f2a9c1b0d.css) with
+# precompressed .gz/.br siblings, and writes dist/manifest.json. At runtime
+# url_for('static', filename='css/style.css') resolves through the manifest,
+# and dist files are served with the best precompressed encoding the client
+# accepts plus `Cache-Control: immutable`, so repeat visits never revalidate.
+# Without a manifest (plain dev checkout) everything behaves as before.
+
+SOURCE_DIRS = ("css", "js")
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_MAX_AGE = 31536000  # one year
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON_RE = re.compile(r":\s+")  # only after colons: "a :hover" is a descendant selector
+
+
+def minify_css(source):
+    source = _CSS_COMMENT_RE.sub("", source)
+    source = _CSS_SPACE_RE.sub(" ", source)
+    source = _CSS_PUNCT_RE.sub(r"\1", source)
+    source = _CSS_COLON_RE.sub(":", source)
+    return source.replace(";}", "}").strip()
+
+
+def minify_js(source):
+    """Conservative JS minification: indentation, blank lines and whole-line // comments."""
+    lines = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines) + "\n"
+
+
+_MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def build_assets(static_folder):
+    """Write fingerprinted, minified and precompressed bundles; returns the manifest."""
+    manifest = {}
+    for folder in SOURCE_DIRS:
+        source_dir = os.path.join(static_folder, folder)
+        if not os.path.isdir(source_dir):
+            continue
+        for name in sorted(os.listdir(source_dir)):
+            stem, ext = os.path.splitext(name)
+            if ext not in _MINIFIERS:
+                continue
+            with open(os.path.join(source_dir, name), encoding="utf-8") as f:
+                data = _MINIFIERS[ext](f.read()).encode("utf-8")
+
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            relpath = f"{DIST_DIR}/{folder}/{stem}.{digest}{ext}"
+            target = os.path.join(static_folder, relpath)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+            with open(target + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(target + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+            manifest[f"{folder}/{name}"] = relpath
+
+    with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def init_assets(app):
+    """Route url_for('static') through the manifest and serve dist/ files precompressed."""
+    app.extensions["asset_manifest"] = load_manifest(app.static_folder)
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == "static":
+            manifest = app.extensions["asset_manifest"]
+            filename = values.get("filename")
+            if filename in manifest:
+                values["filename"] = manifest[filename]
+
+    def serve_static(filename):
+        if not filename.startswith(DIST_DIR + "/"):
+            return app.send_static_file(filename)
+        return _send_fingerprinted(app.static_folder, filename)
+
+    app.view_functions["static"] = serve_static
+
+
+def _send_fingerprinted(static_folder, filename):
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    encoding, suffix = None, ""
+    for candidate, ext in (("br", ".br"), ("gzip", ".gz")):
+        if candidate in request.accept_encodings and os.path.exists(os.path.join(static_folder, filename + ext)):
+            encoding, suffix = candidate, ext
+            break
+
+    response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
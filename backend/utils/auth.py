@@ -0,0 +1,19 @@
+# backend/utils/auth.py
+from functools import wraps
+
+from flask import jsonify, session
+
+
+def login_required_json(view):
+    """401 JSON for anonymous callers of a JSON endpoint.
+
+    Put it above ``@idempotent`` so an anonymous attempt never claims the
+    client's Idempotency-Key.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not session.get("user_id"):
+            return jsonify({"error": "Login required"}), 401
+        return view(*args, **kwargs)
+
+    return wrapper
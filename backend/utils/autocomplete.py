@@ -0,0 +1,141 @@
+# backend/utils/autocomplete.py
+import threading
+import time
+from bisect import bisect_left
+
+from backend.extensions import db
+from backend.models import Product
+
+# ====== Search-as-you-type prefix index ======
+# A sorted array of lowercase keys searched with bisect: a prefix lookup is
+# O(log n) to find the first match plus a short scan. Every word position of
+# a product name gets its own key ("hiking boots", "boots") so typing any word
+# of the name matches. Built on first use, updated incrementally when products
+# are added here, and rebuilt in the background every REBUILD_INTERVAL seconds to
+# pick up writes from other workers.
+
+REBUILD_INTERVAL = 600
+_SCAN_LIMIT = 200
+
+
+class PrefixIndex:
+    def __init__(self):
+        # (keys, entries) swapped as one tuple so readers never need the lock;
+        # entries[i] = (label, kind, product_id, is_name_start) for keys[i]
+        self._data = ([], [])
+        self._categories = set()
+        self._lock = threading.Lock()
+        self.built_at = None
+        self._rebuilding = False
+
+    @staticmethod
+    def _keys_for(label):
+        words = label.lower().split()
+        for i in range(len(words)):
+            yield " ".join(words[i:]), i == 0
+
+    def build(self, products, categories):
+        """Replace the index from ``(product_id, name)`` pairs and category names."""
+        pairs = []
+        for product_id, name in products:
+            if name:
+                pairs.extend((key, (name, "product", product_id, start)) for key, start in self._keys_for(name))
+        for category in categories:
+            if category:
+                pairs.append((category.lower(), (category, "category", None, True)))
+        pairs.sort(key=lambda p: p[0])
+        keys = [k for k, _ in pairs]
+        entries = [e for _, e in pairs]
+        with self._lock:
+            self._data = (keys, entries)
+            self._categories = {c for c in categories if c}
+            self.built_at = time.monotonic()
+
+    def add(self, label, kind="product", product_id=None):
+        """Insert one label (copy-on-write; meant for occasional admin adds)."""
+        if not label:
+            return
+        with self._lock:
+            if kind == "category":
+                if label in self._categories:
+                    return
+                self._categories.add(label)
+                new_keys = [(label.lower(), True)]
+            else:
+                new_keys = self._keys_for(label)
+            keys, entries = list(self._data[0]), list(self._data[1])
+            for key, start in new_keys:
+                i = bisect_left(keys, key)
+                keys.insert(i, key)
+                entries.insert(i, (label, kind, product_id, start))
+            self._data = (keys, entries)
+
+    def search(self, prefix, limit=8):
+        """Top ``limit`` suggestions: categories, then name-start matches, then shorter labels."""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        keys, entries = self._data
+        i = bisect_left(keys, prefix)
+        seen = set()
+        matches = []
+        while i < len(keys) and len(matches) < _SCAN_LIMIT and keys[i].startswith(prefix):
+            label, kind, product_id, start = entries[i]
+            if (kind, label) not in seen:
+                seen.add((kind, label))
+                matches.append((kind != "category", not start, len(label), label, kind, product_id))
+            i += 1
+        matches.sort()
+        return [
+            {"label": label, "type": kind, "product_id": product_id}
+            for _, _, _, label, kind, product_id in matches[:limit]
+        ]
+
+    def is_stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > REBUILD_INTERVAL
+
+    def claim_rebuild(self):
+        """True for exactly one caller while the index is stale; pair with ``release_rebuild``."""
+        with self._lock:
+            if self._rebuilding or not self.is_stale():
+                return False
+            self._rebuilding = True
+            return True
+
+    def release_rebuild(self):
+        with self._lock:
+            self._rebuilding = False
+
+
+suggestion_index = PrefixIndex()
+
+
+def _build_from_db():
+    products = db.session.query(Product.product_id, Product.name).yield_per(5000)
+    categories = [c for (c,) in db.session.query(Product.category).distinct()]
+    suggestion_index.build(products, categories)
+
+
+def _rebuild_in_background(app):
+    try:
+        with app.app_context():
+            _build_from_db()
+    finally:
+        suggestion_index.release_rebuild()
+
+
+def ensure_suggestion_index(app):
+    """Build the index synchronously on first use; refresh it in a thread when stale."""
+    if suggestion_index.built_at is None:
+        _build_from_db()
+    elif suggestion_index.is_stale() and suggestion_index.claim_rebuild():
+        threading.Thread(target=_rebuild_in_background, args=(app,), daemon=True).start()
+    return suggestion_index
+
+
+def add_product_suggestion(product):
+    """Make a newly created product suggestible in this worker right away."""
+    if suggestion_index.built_at is None:
+        return
+    suggestion_index.add(product.name, "product", product.product_id)
+    suggestion_index.add(product.category, "category")
@@ -0,0 +1,200 @@
+# backend/utils/cart_service.py
+from collections import namedtuple
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.extensions import db
+from backend.models import Cart, CartItem, Product
+
+# ====== Cart summaries ======
+# Cart pages, checkout and payment all need the same "lines + total" view of
+# a cart. Loading it as one CartItem JOIN Product query keeps the cost at a
+# constant number of queries however many lines the cart has (instead of a
+# lazy item.product load per line), and all money stays in exact Decimals.
+
+CENT = Decimal("0.01")
+
+CartLine = namedtuple("CartLine", ["item_id", "product_id", "name", "image", "unit_price", "quantity", "subtotal"])
+CartSummary = namedtuple("CartSummary", ["cart_id", "lines", "total", "item_count"])
+
+
+def load_cart_summary(cart_id):
+    """Lines and Decimal totals for ``cart_id`` in a single query."""
+    rows = (
+        db.session.query(
+            CartItem.item_id, CartItem.product_id, Product.name, Product.image, Product.price, CartItem.quantity
+        )
+        .join(Product, Product.product_id == CartItem.product_id)
+        .filter(CartItem.cart_id == cart_id)
+        .order_by(CartItem.item_id)
+        .all()
+    )
+
+    lines = []
+    total = Decimal("0.00")
+    for item_id, product_id, name, image, price, quantity in rows:
+        unit_price = Decimal(price or 0).quantize(CENT)
+        subtotal = unit_price * quantity
+        total += subtotal
+        lines.append(CartLine(item_id, product_id, name, image, unit_price, quantity, subtotal))
+
+    return CartSummary(cart_id, lines, total, sum(line.quantity for line in lines))
+
+
+def get_or_create_active_cart(user_id):
+    """The user's active cart, created (flushed, not committed) if missing."""
+    cart = Cart.query.filter_by(user_id=user_id, status="active").first()
+    if not cart:
+        cart = Cart(user_id=user_id, status="active", created_at=datetime.utcnow())
+        db.session.add(cart)
+        db.session.flush()  # assigns cart_id; committed together with the caller's write
+    return cart
+
+
+def active_cart_summary(user_id):
+    """Summary of the user's active cart, or None if they have none (two queries)."""
+    cart = Cart.query.filter_by(user_id=user_id, status="active").first()
+    if not cart:
+        return None
+    return load_cart_summary(cart.cart_id)
+
+
+# ====== Add-to-cart upsert ======
+# cart_item has a unique (cart_id, product_id) constraint, so adding a product
+# is a single INSERT ... ON CONFLICT DO UPDATE that increments the existing
+# quantity in the database. No SELECT-then-write, no lost update when two
+# requests add the same product at once.
+
+_DIALECT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def upsert_cart_item(cart_id, product_id, quantity):
+    """Add ``quantity`` of a product to a cart in one statement. Caller commits."""
+    upsert_cart_items(cart_id, {product_id: quantity})
+
+
+def upsert_cart_items(cart_id, quantities, increment=True):
+    """Write ``{product_id: quantity}`` to a cart as one executemany upsert. Caller commits.
+
+    Existing lines are incremented by the given quantity, or overwritten
+    with it when ``increment`` is False (set-quantity).
+    """
+    if not quantities:
+        return
+    insert = _DIALECT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        # other backends: row-locked read-modify-write
+        existing = {
+            item.product_id: item
+            for item in CartItem.query.filter(
+                CartItem.cart_id == cart_id, CartItem.product_id.in_(list(quantities))
+            ).with_for_update()
+        }
+        for product_id, quantity in quantities.items():
+            if product_id in existing:
+                item = existing[product_id]
+                item.quantity = item.quantity + quantity if increment else quantity
+            else:
+                db.session.add(CartItem(cart_id=cart_id, product_id=product_id, quantity=quantity))
+        return
+
+    stmt = insert(CartItem.__table__)
+    quantity = stmt.excluded.quantity
+    if increment:
+        quantity = CartItem.__table__.c.quantity + quantity
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["cart_id", "product_id"],
+        set_={"quantity": quantity, "updated_at": stmt.excluded.updated_at},
+    )
+    now = datetime.utcnow()
+    db.session.execute(
+        stmt,
+        [
+            {"cart_id": cart_id, "product_id": pid, "quantity": qty, "updated_at": now}
+            for pid, qty in quantities.items()
+        ],
+    )
+
+
+def remove_cart_items(cart_id, product_ids):
+    """Delete the given products from a cart in one statement. Caller commits."""
+    if not product_ids:
+        return
+    db.session.execute(
+        delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id.in_(list(product_ids)))
+    )
+
+
+# ====== Batch cart operations ======
+
+MAX_BATCH_OPERATIONS = 200
+
+
+def fold_cart_operations(operations):
+    """Collapse add/set/remove operations to one final action per product.
+
+    ``operations`` is a list of ``{"op": "add"|"set"|"remove", "product_id",
+    "quantity"}``. Returns ``(adds, sets, removes)``: ``{pid: delta}``,
+    ``{pid: quantity}`` and a set of pids. Later operations win; an add after
+    a set just raises the set quantity, and ``set`` to 0 is a remove.
+    Raises ValueError on malformed input.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"at most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    adds, sets, removes = {}, {}, set()
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise ValueError("each operation must be an object")
+        op = operation.get("op")
+        try:
+            product_id = int(operation.get("product_id"))
+            quantity = int(operation.get("quantity", 1))
+        except (TypeError, ValueError):
+            raise ValueError("product_id and quantity must be integers")
+
+        if op == "add":
+            if quantity < 1:
+                raise ValueError("add quantity must be at least 1")
+            if product_id in sets:
+                sets[product_id] += quantity
+            elif product_id in removes:
+                removes.discard(product_id)
+                sets[product_id] = quantity
+            else:
+                adds[product_id] = adds.get(product_id, 0) + quantity
+        elif op == "set":
+            if quantity < 0:
+                raise ValueError("set quantity cannot be negative")
+            adds.pop(product_id, None)
+            if quantity == 0:
+                sets.pop(product_id, None)
+                removes.add(product_id)
+            else:
+                removes.discard(product_id)
+                sets[product_id] = quantity
+        elif op == "remove":
+            adds.pop(product_id, None)
+            sets.pop(product_id, None)
+            removes.add(product_id)
+        else:
+            raise ValueError(f"unknown op: {op!r}")
+    return adds, sets, removes
+
+
+def apply_cart_operations(cart_id, adds, sets, removes):
+    """Apply folded operations with at most three statements. Caller commits."""
+    remove_cart_items(cart_id, removes)
+    upsert_cart_items(cart_id, sets, increment=False)
+    upsert_cart_items(cart_id, adds)
+
+
+def to_paise(amount):
+    """Rupees (Decimal) -> integer paise for Razorpay, rounded half-up."""
+    return int((Decimal(amount) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
@@ -0,0 +1,96 @@
+# backend/utils/facets.py
+from decimal import Decimal
+
+from sqlalchemy import case, func
+
+from backend.extensions import db
+from backend.models import Product
+from backend.utils.cache import TTLCache
+from backend.utils.search import apply_product_search, search_tokens
+
+# ====== Category and price facets ======
+# One aggregate per (search term) instead of a DISTINCT scan per page view,
+# cached per worker. Admin writes clear it; the TTL bounds staleness for
+# writes made by other workers or offline scripts.
+
+_facet_cache = TTLCache(maxsize=256, ttl=120)
+
+HISTOGRAM_BUCKETS = 5
+
+
+def category_facets(search_query=""):
+    """Return ``[(category, product_count), ...]`` sorted by category name."""
+    key = " ".join(search_tokens(search_query))
+    return _facet_cache.get_or_load(key, lambda: _load_category_facets(search_query))
+
+
+def _load_category_facets(search_query):
+    query = db.session.query(Product.category, func.count(Product.product_id))
+    if search_query:
+        query = apply_product_search(query, search_query).order_by(None)
+    rows = (
+        query.filter(Product.category.isnot(None))
+        .group_by(Product.category)
+        .order_by(Product.category)
+        .all()
+    )
+    return [(category, count) for category, count in rows]
+
+
+def _price_bounds(category):
+    """(min, max) price of a category (or the whole catalog), cached."""
+    def load():
+        query = db.session.query(func.min(Product.price), func.max(Product.price))
+        if category:
+            query = query.filter(Product.category == category)
+        return query.one()
+
+    return _facet_cache.get_or_load(("bounds", category), load)
+
+
+def price_histogram(search_query="", category="", buckets=HISTOGRAM_BUCKETS):
+    """Bucket counts of product prices for the current search/category.
+
+    Bucket edges come from the cached price range of the category, so the
+    counts themselves are a single aggregate query:
+    ``SUM(CASE WHEN price >= lo AND price < hi THEN 1 ELSE 0 END)`` per bucket.
+    """
+    key = ("histogram", " ".join(search_tokens(search_query)), category, buckets)
+    return _facet_cache.get_or_load(key, lambda: _load_price_histogram(search_query, category, buckets))
+
+
+def _load_price_histogram(search_query, category, buckets):
+    low, high = _price_bounds(category)
+    if low is None:
+        return []
+    cent = Decimal("0.01")
+    low, high = Decimal(low).quantize(cent), Decimal(high).quantize(cent)
+    width = (high - low) / buckets
+    if width <= 0:
+        edges = [(low, high)]
+    else:
+        cuts = [low] + [(low + width * i).quantize(cent) for i in range(1, buckets)] + [high]
+        edges = list(zip(cuts, cuts[1:]))
+
+    columns = []
+    for i, (lo, hi) in enumerate(edges):
+        # last bucket is closed so the max price is counted
+        upper = Product.price <= hi if i == len(edges) - 1 else Product.price < hi
+        columns.append(func.sum(case(((Product.price >= lo) & upper, 1), else_=0)))
+
+    query = db.session.query(*columns)
+    if search_query:
+        query = apply_product_search(query, search_query).order_by(None)
+    if category:
+        query = query.filter(Product.category == category)
+    counts = query.one()
+
+    return [
+        {"min": lo, "max": hi, "closed": i == len(edges) - 1, "count": int(count or 0)}
+        for i, ((lo, hi), count) in enumerate(zip(edges, counts))
+    ]
+
+
+def invalidate_category_facets():
+    """Drop cached facets after products are created, repriced or recategorized."""
+    _facet_cache.clear()
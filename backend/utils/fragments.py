@@ -0,0 +1,28 @@
+# backend/utils/fragments.py
+from flask import render_template
+from markupsafe import Markup
+
+from backend.utils.cache import TTLCache
+
+# ====== Rendered fragment cache ======
+# A product card only changes when its product row changes, so the rendered
+# HTML is cached under (variant, product_id, updated_at). A new updated_at
+# means a new key; stale versions simply age out of the LRU.
+
+CARD_TEMPLATE = "_product_card.html"
+
+_fragment_cache = TTLCache(maxsize=5000, ttl=3600)
+
+
+def render_product_card(product, variant="listing"):
+    """Rendered card HTML for ``product`` (template global ``product_card``)."""
+    key = (variant, product.product_id, getattr(product, "updated_at", None))
+    html = _fragment_cache.get(key)
+    if html is None:
+        html = Markup(render_template(CARD_TEMPLATE, product=product, variant=variant))
+        _fragment_cache.set(key, html)
+    return html
+
+
+def fragment_cache_stats():
+    return _fragment_cache.stats()
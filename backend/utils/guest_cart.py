@@ -0,0 +1,97 @@
+# backend/utils/guest_cart.py
+from decimal import Decimal
+
+from flask import after_this_request, current_app, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from backend.utils.cart_service import CENT, CartLine, CartSummary, get_or_create_active_cart, upsert_cart_items
+from backend.utils.product_cache import get_product_record
+
+# ====== Guest cart ======
+# Shoppers who are not logged in keep their cart in a signed cookie
+# ({product_id: quantity}, compressed by itsdangerous) instead of Cart /
+# CartItem rows. Reads validate every line against the product cache, so
+# deleted products simply drop out. The cookie is merged into the user's DB
+# cart with one bulk upsert at login or checkout and then cleared, so carts
+# that are abandoned never cost a database write.
+
+GUEST_CART_COOKIE = "guest_cart"
+GUEST_CART_MAX_AGE = 30 * 24 * 3600
+MAX_GUEST_LINES = 50
+MAX_LINE_QUANTITY = 99
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt="guest-cart")
+
+
+def read_guest_cart():
+    """``{product_id: quantity}`` from the request cookie; empty if missing or tampered with."""
+    raw = request.cookies.get(GUEST_CART_COOKIE)
+    if not raw:
+        return {}
+    try:
+        data = _serializer().loads(raw, max_age=GUEST_CART_MAX_AGE)
+        lines = {int(pid): int(qty) for pid, qty in data.items()}
+    except (BadSignature, AttributeError, TypeError, ValueError):
+        return {}
+    return {pid: min(qty, MAX_LINE_QUANTITY) for pid, qty in lines.items() if qty > 0}
+
+
+def save_guest_cart(response, lines):
+    """Write ``lines`` back to the cookie (or delete it when the cart is empty)."""
+    if not lines:
+        response.delete_cookie(GUEST_CART_COOKIE)
+        return response
+    payload = {str(pid): qty for pid, qty in list(lines.items())[:MAX_GUEST_LINES]}
+    response.set_cookie(
+        GUEST_CART_COOKIE,
+        _serializer().dumps(payload),
+        max_age=GUEST_CART_MAX_AGE,
+        httponly=True,
+        samesite="Lax",
+    )
+    return response
+
+
+def add_guest_item(lines, product_id, quantity):
+    """Return a copy of ``lines`` with ``quantity`` more of ``product_id``."""
+    lines = dict(lines)
+    lines[product_id] = min(lines.get(product_id, 0) + quantity, MAX_LINE_QUANTITY)
+    if lines[product_id] <= 0:
+        del lines[product_id]
+    return lines
+
+
+def guest_cart_summary(lines):
+    """CartSummary for a guest cart; item_id is the product_id (there is no row)."""
+    summary_lines = []
+    total = Decimal("0.00")
+    for product_id, quantity in lines.items():
+        record = get_product_record(product_id)
+        if record is None:
+            continue
+        unit_price = Decimal(record.price or 0).quantize(CENT)
+        subtotal = unit_price * quantity
+        total += subtotal
+        summary_lines.append(
+            CartLine(product_id, product_id, record.name, record.image, unit_price, quantity, subtotal)
+        )
+    return CartSummary(None, summary_lines, total, sum(line.quantity for line in summary_lines))
+
+
+def merge_guest_cart(user_id):
+    """Fold the request's guest cookie into the user's active cart. Caller commits.
+
+    Lines are validated against the product cache and written with one bulk
+    upsert; the cookie is cleared on the outgoing response. Returns the
+    number of lines merged.
+    """
+    lines = {pid: qty for pid, qty in read_guest_cart().items() if get_product_record(pid) is not None}
+    if request.cookies.get(GUEST_CART_COOKIE):
+        after_this_request(lambda response: save_guest_cart(response, {}))
+    if not lines:
+        return 0
+    cart = get_or_create_active_cart(user_id)
+    upsert_cart_items(cart.cart_id, lines)
+    return len(lines)
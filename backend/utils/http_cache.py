@@ -0,0 +1,77 @@
+# backend/utils/http_cache.py
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import Response, make_response, request, session
+from sqlalchemy import func
+
+from backend.extensions import db
+from backend.models import Product
+from backend.utils.cache import TTLCache
+
+# ====== Conditional GET for catalog pages ======
+# Every catalog response carries an ETag/Last-Modified derived from
+# max(product.updated_at) (an index lookup, memoised for a couple of seconds
+# per worker). A repeat request with a matching If-None-Match or
+# If-Modified-Since gets a bodyless 304 before the view renders anything.
+
+_version_cache = TTLCache(maxsize=1, ttl=2)
+
+
+def catalog_last_modified():
+    """Timestamp of the most recent product insert/update (None for an empty catalog)."""
+    return _version_cache.get_or_load(
+        "catalog", lambda: db.session.query(func.max(Product.updated_at)).scalar()
+    )
+
+
+def _etag_for(last_modified, user_id):
+    # Pages render the signed-in user's name, so each user gets their own validator
+    raw = f"{request.full_path}|{last_modified.isoformat() if last_modified else '-'}|{user_id or ''}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional_catalog(max_age=60, s_maxage=300):
+    """Decorator: answer 304 when the catalog has not changed since the client's copy."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            last_modified = catalog_last_modified()
+            user_id = session.get("user_id")
+            etag = _etag_for(last_modified, user_id)
+
+            if _not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+            if user_id:
+                response.cache_control.private = True
+                response.cache_control.max_age = 0
+                response.cache_control.must_revalidate = True
+            else:
+                # anonymous pages are shareable: let a CDN hold them longer than browsers
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+                response.cache_control.s_maxage = s_maxage
+            response.vary.add("Cookie")
+            return response
+
+        return wrapper
+
+    return decorator
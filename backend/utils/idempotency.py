@@ -0,0 +1,124 @@
+# backend/utils/idempotency.py
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import jsonify, make_response, request, session
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.models import IdempotencyKey
+
+# ====== Idempotency keys ======
+# Checkout endpoints create a Razorpay order and an Order row on every call,
+# so a double-click or client retry used to produce duplicates. A client
+# that sends an `Idempotency-Key` header now gets exactly one execution per
+# key: the first request claims the key (unique (scope, key) row), runs,
+# and stores its response; repeats replay that response without touching
+# the gateway or the database. Requests without the header behave as before.
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+KEY_RETENTION = timedelta(hours=24)
+IN_FLIGHT_TIMEOUT = timedelta(minutes=2)  # a claim older than this is assumed dead
+
+
+def _request_hash():
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path} {session.get('user_id')}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _claim(scope, key, request_hash):
+    """Try to own ``key``: returns ``(True, None)`` or ``(False, existing_row_or_None)``."""
+    existing = None
+    for _ in range(2):  # second pass covers a key released between our INSERT and SELECT
+        db.session.add(IdempotencyKey(scope=scope, key=key, request_hash=request_hash))
+        try:
+            db.session.commit()
+            return True, None
+        except IntegrityError:
+            db.session.rollback()
+
+        # the first attempt may have died without finishing: take a stale claim
+        # over (conditional, so only one retry wins)
+        taken = db.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+                IdempotencyKey.created_at < datetime.utcnow() - IN_FLIGHT_TIMEOUT,
+            )
+            .values(created_at=datetime.utcnow(), request_hash=request_hash)
+        ).rowcount
+        db.session.commit()
+        if taken:
+            return True, None
+        existing = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+        if existing is not None:
+            break
+    return False, existing
+
+
+def _release(scope, key):
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key))
+    db.session.commit()
+
+
+def idempotent(scope):
+    """Honour an ``Idempotency-Key`` header on a JSON POST endpoint.
+
+    Replays the stored response for a repeated key, answers 409 while the
+    first request is still running and 422 if the key is reused with a
+    different request. 5xx responses and exceptions release the key so the
+    client can retry.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view(*args, **kwargs)
+            if len(key) > 255:
+                return jsonify({"error": f"{IDEMPOTENCY_HEADER} too long"}), 400
+
+            request_hash = _request_hash()
+            owned, existing = _claim(scope, key, request_hash)
+            if not owned:
+                if existing is not None and existing.request_hash != request_hash:
+                    return jsonify({"error": f"{IDEMPOTENCY_HEADER} reused with a different request"}), 422
+                if existing is None or existing.status_code is None:
+                    response = jsonify({"error": "A request with this key is still in progress"})
+                    response.status_code = 409
+                    response.headers["Retry-After"] = "1"
+                    return response
+                response = make_response(existing.response_body, existing.status_code)
+                response.mimetype = "application/json"
+                response.headers["Idempotent-Replayed"] = "true"
+                return response
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                _release(scope, key)
+                raise
+
+            if response.status_code >= 500:
+                _release(scope, key)
+                return response
+            db.session.rollback()  # the view has committed; drop anything it left pending
+            db.session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .values(status_code=response.status_code, response_body=response.get_data(as_text=True))
+            )
+            db.session.commit()
+            return response
+
+        return wrapper
+
+    return decorator
+
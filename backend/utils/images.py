@@ -0,0 +1,141 @@
+# backend/utils/images.py
+import hashlib
+import io
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import requests
+from flask import current_app, url_for
+from PIL import Image, UnidentifiedImageError
+from requests.adapters import HTTPAdapter
+from sqlalchemy import bindparam, update
+
+from backend.extensions import db
+from backend.models import Product
+
+# ====== Product image ingestion ======
+# Source images (remote URLs from the admin form / CSV imports) are fetched
+# once by a thread pool, resized to fixed thumbnail sizes and written to a
+# content-addressed cache: static/thumbs/<ab>/<sha256>_<size>.webp. The hash
+# is stored on Product.image_key and templates link to the local thumbnail
+# instead of the full-size third-party image. Identical sources share files.
+
+THUMB_SIZES = {"sm": 320, "lg": 800}
+THUMB_FORMAT = "webp"
+THUMB_DIR = "thumbs"
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+FETCH_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+
+class ImageIngestError(Exception):
+    pass
+
+
+def _thumb_relpath(key, size):
+    return f"{THUMB_DIR}/{key[:2]}/{key}_{size}.{THUMB_FORMAT}"
+
+
+def _new_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_source(url, session):
+    """Raw bytes of a source image (http(s)://, file:// or a local path)."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https"):
+        with session.get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            data = response.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+    else:
+        path = url2pathname(parsed.path) if parsed.scheme == "file" else url
+        with open(path, "rb") as f:
+            data = f.read(MAX_SOURCE_BYTES + 1)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageIngestError(f"source larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+
+def store_thumbnails(data, static_folder):
+    """Write every thumbnail size for ``data``; returns its content hash."""
+    key = hashlib.sha256(data).hexdigest()
+    targets = {size: os.path.join(static_folder, _thumb_relpath(key, size)) for size in THUMB_SIZES}
+    if all(os.path.exists(path) for path in targets.values()):
+        return key  # already ingested from another product/URL
+
+    try:
+        source = Image.open(io.BytesIO(data))
+        source.load()
+    except (UnidentifiedImageError, OSError) as e:
+        raise ImageIngestError(f"not an image: {e}") from e
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+
+    os.makedirs(os.path.dirname(next(iter(targets.values()))), exist_ok=True)
+    for size, path in targets.items():
+        thumb = source.copy()
+        thumb.thumbnail((THUMB_SIZES[size], THUMB_SIZES[size]))
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        thumb.save(tmp_path, THUMB_FORMAT, quality=80, method=4)
+        os.replace(tmp_path, path)  # atomic: readers never see a half-written file
+    return key
+
+
+def _ingest_one(product_id, url, session, static_folder):
+    try:
+        return product_id, store_thumbnails(fetch_source(url, session), static_folder), None
+    except (requests.RequestException, OSError, ImageIngestError) as e:
+        return product_id, None, str(e)
+
+
+def ingest_product_images(limit=500, workers=8, reingest=False, after_id=0):
+    """Fetch and thumbnail up to ``limit`` product images concurrently.
+
+    Without ``reingest`` only products that have an image URL but no
+    thumbnails yet are processed. Batches walk forward by product_id from
+    ``after_id`` so dead URLs don't block the queue. Returns
+    ``(ingested, failures, last_id)`` where failures is a list of
+    ``(product_id, error)`` and last_id is None once nothing is left.
+    Caller commits.
+    """
+    query = db.session.query(Product.product_id, Product.image).filter(
+        Product.image.isnot(None), Product.product_id > after_id
+    )
+    if not reingest:
+        query = query.filter(Product.image_key.is_(None))
+    pending = query.order_by(Product.product_id).limit(limit).all()
+    if not pending:
+        return 0, [], None
+
+    static_folder = current_app.static_folder
+    session = _new_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda row: _ingest_one(row[0], row[1], session, static_folder), pending))
+    finally:
+        session.close()
+
+    done = [{"pid": pid, "key": key} for pid, key, _ in results if key]
+    failures = [(pid, error) for pid, _, error in results if error]
+    if done:
+        stmt = (
+            update(Product.__table__)
+            .where(Product.__table__.c.product_id == bindparam("pid"))
+            .values(image_key=bindparam("key"))
+        )
+        db.session.execute(stmt, done)
+    return len(done), failures, pending[-1][0]
+
+
+def product_image_url(product, size="sm"):
+    """Local thumbnail URL when ingested, else the original URL (template global)."""
+    key = getattr(product, "image_key", None)
+    if key:
+        return url_for("static", filename=_thumb_relpath(key, size))
+    return product.image or url_for("static", filename="images/default.png")
@@ -0,0 +1,260 @@
+# backend/utils/inventory_service.py
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.extensions import db
+from backend.models import Inventory, InventoryLog, OrderItem, Product, StockReservation
+
+# ====== Stock reservations ======
+# Checkout reserves stock with one conditional UPDATE per product:
+#   UPDATE inventory SET reserved_stock = reserved_stock + :qty
+#   WHERE product_id = :pid AND stock_quantity - reserved_stock >= :qty
+# The database evaluates the check and the write atomically, so concurrent
+# checkouts can never reserve more than is on hand; a rowcount of 0 means
+# out of stock. Products are reserved in product_id order so two carts
+# with the same SKUs lock rows in the same order and cannot deadlock.
+# Payment confirms the order's stock (confirm_order_stock: held stock
+# actually leaves, and lines whose hold already expired are reserved
+# again or the payment is refused); held reservations that outlive
+# RESERVATION_TTL are released by the maintenance sweep.
+
+RESERVATION_TTL = timedelta(minutes=15)
+
+_DIALECT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"product {product_id} is out of stock")
+        self.product_id = product_id
+
+
+def ensure_inventory_rows(product_ids):
+    """Create missing inventory rows, seeded from Product.stock_qty. Caller commits."""
+    inv = Inventory.__table__
+    source = (
+        select(Product.product_id, Product.stock_qty, literal(0), literal(0))
+        .where(Product.product_id.in_(list(product_ids)))
+        .where(~exists().where(inv.c.product_id == Product.product_id))
+    )
+    dialect_insert = _DIALECT_INSERTS.get(db.session.get_bind().dialect.name)
+    columns = ["product_id", "stock_quantity", "reserved_stock", "reorder_level"]
+    if dialect_insert is None:
+        db.session.execute(insert(inv).from_select(columns, source))
+    else:
+        # a concurrent checkout may seed the same product first
+        stmt = dialect_insert(inv).from_select(columns, source).on_conflict_do_nothing(index_elements=["product_id"])
+        db.session.execute(stmt)
+
+
+def reserve_stock(order_id, quantities, ttl=RESERVATION_TTL):
+    """Hold ``{product_id: quantity}`` for an order. Caller commits.
+
+    Raises OutOfStock on the first product that cannot be covered; the
+    caller must roll back so reservations made earlier in the same
+    transaction are undone.
+    """
+    ensure_inventory_rows(quantities)
+    inv = Inventory.__table__
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        result = db.session.execute(
+            update(inv)
+            .where(inv.c.product_id == product_id, inv.c.stock_quantity - inv.c.reserved_stock >= quantity)
+            .values(reserved_stock=inv.c.reserved_stock + quantity)
+        )
+        if result.rowcount != 1:
+            raise OutOfStock(product_id)
+
+    expires_at = datetime.utcnow() + ttl
+    db.session.execute(
+        insert(StockReservation.__table__),
+        [
+            {"order_id": order_id, "product_id": pid, "quantity": qty, "status": "held", "expires_at": expires_at}
+            for pid, qty in quantities.items()
+        ],
+    )
+
+
+def _claim(reservation_id, new_status):
+    """Move one held reservation to ``new_status``; False if someone else got it first."""
+    res = StockReservation.__table__
+    result = db.session.execute(
+        update(res)
+        .where(res.c.reservation_id == reservation_id, res.c.status == "held")
+        .values(status=new_status)
+    )
+    return result.rowcount == 1
+
+
+def confirm_reservations(order_id):
+    """Turn an order's held stock into a sale (on payment). Caller commits.
+
+    Each reservation is claimed with a conditional status flip, so a retry
+    of the payment callback (or a race with the expiry sweep) never takes
+    stock twice. Returns the number of reservations confirmed.
+    """
+    inv = Inventory.__table__
+    held = db.session.execute(
+        select(StockReservation.reservation_id, StockReservation.product_id, StockReservation.quantity)
+        .where(StockReservation.order_id == order_id, StockReservation.status == "held")
+    ).all()
+
+    confirmed = 0
+    for reservation_id, product_id, quantity in held:
+        if not _claim(reservation_id, "confirmed"):
+            continue
+        db.session.execute(
+            update(inv)
+            .where(inv.c.product_id == product_id)
+            .values(stock_quantity=inv.c.stock_quantity - quantity, reserved_stock=inv.c.reserved_stock - quantity)
+        )
+        before = db.session.execute(
+            select(Product.stock_qty).where(Product.product_id == product_id)
+        ).scalar_one()
+        db.session.execute(
+            update(Product).where(Product.product_id == product_id).values(stock_qty=Product.stock_qty - quantity)
+        )
+        db.session.add(InventoryLog(
+            product_id=product_id,
+            change_type="sale",
+            before=before,
+            after=before - quantity,
+            reason=f"Order #{order_id}",
+            timestamp=datetime.utcnow(),
+        ))
+        confirmed += 1
+    return confirmed
+
+
+def confirm_order_stock(order_id):
+    """Turn every line of a paid order into a sale. Caller commits.
+
+    Held reservations are confirmed. Lines whose hold has expired (or was
+    never made) are reserved again with the same conditional UPDATE first.
+    If a line can no longer be covered, nothing is taken, the order's
+    remaining holds are released and OutOfStock is raised: the payment
+    must go to review/refund instead of the order being marked paid.
+    Returns the product ids whose stock changed.
+    """
+    needed = dict(db.session.execute(
+        select(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .where(OrderItem.order_id == order_id)
+        .group_by(OrderItem.product_id)
+    ).all())
+    covered = dict(db.session.execute(
+        select(StockReservation.product_id, func.sum(StockReservation.quantity))
+        .where(StockReservation.order_id == order_id, StockReservation.status.in_(("held", "confirmed")))
+        .group_by(StockReservation.product_id)
+    ).all())
+    missing = {pid: qty - covered.get(pid, 0) for pid, qty in needed.items() if qty > covered.get(pid, 0)}
+
+    if missing:
+        try:
+            with db.session.begin_nested():
+                reserve_stock(order_id, missing)
+        except OutOfStock:
+            release_reservations(order_id)
+            raise
+    confirm_reservations(order_id)
+    return sorted(needed)
+
+
+def _release(rows):
+    """Return the still-held ``(reservation_id, product_id, quantity)`` rows to stock."""
+    inv = Inventory.__table__
+    freed = defaultdict(int)
+    released = 0
+    for reservation_id, product_id, quantity in rows:
+        if _claim(reservation_id, "released"):
+            freed[product_id] += quantity
+            released += 1
+    for product_id, quantity in sorted(freed.items()):
+        db.session.execute(
+            update(inv)
+            .where(inv.c.product_id == product_id)
+            .values(reserved_stock=inv.c.reserved_stock - quantity)
+        )
+    return released
+
+
+def release_reservations(order_id):
+    """Give back an order's held stock (payment failed / order cancelled). Caller commits."""
+    held = db.session.execute(
+        select(StockReservation.reservation_id, StockReservation.product_id, StockReservation.quantity)
+        .where(StockReservation.order_id == order_id, StockReservation.status == "held")
+    ).all()
+    return _release(held)
+
+
+def release_order_reservations(order_ids):
+    """Give back the held stock of many orders at once (bulk cancel). Caller commits.
+
+    One UPDATE flips every held reservation of the orders to released, then
+    one inventory UPDATE per product returns the quantity. The held rows are
+    locked first, so a concurrent confirm or sweep can't claim them too.
+    """
+    res = StockReservation.__table__
+    held = db.session.execute(
+        select(res.c.reservation_id, res.c.product_id, res.c.quantity)
+        .where(res.c.order_id.in_(list(order_ids)), res.c.status == "held")
+        .with_for_update()
+    ).all()
+    if not held:
+        return 0
+
+    db.session.execute(
+        update(res)
+        .where(res.c.reservation_id.in_([row[0] for row in held]), res.c.status == "held")
+        .values(status="released")
+    )
+    freed = defaultdict(int)
+    for _, product_id, quantity in held:
+        freed[product_id] += quantity
+    inv = Inventory.__table__
+    for product_id, quantity in sorted(freed.items()):
+        db.session.execute(
+            update(inv)
+            .where(inv.c.product_id == product_id)
+            .values(reserved_stock=inv.c.reserved_stock - quantity)
+        )
+    return len(held)
+
+
+def release_expired_reservations(now=None, chunk_size=500, pause=0):
+    """Release held reservations past their expiry, one committed chunk at a time."""
+    now = now or datetime.utcnow()
+    released, last_id = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(StockReservation.reservation_id, StockReservation.product_id, StockReservation.quantity)
+            .where(
+                StockReservation.status == "held",
+                StockReservation.expires_at < now,
+                StockReservation.reservation_id > last_id,
+            )
+            .order_by(StockReservation.reservation_id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return released
+        released += _release(rows)
+        db.session.commit()
+        if len(rows) < chunk_size:
+            return released
+        last_id = rows[-1][0]
+        if pause:
+            time.sleep(pause)
+
+
+def adjust_inventory_stock(product_id, delta):
+    """Keep inventory.stock_quantity in step with an admin restock/adjustment. Caller commits."""
+    inv = Inventory.__table__
+    db.session.execute(
+        update(inv).where(inv.c.product_id == product_id).values(stock_quantity=inv.c.stock_quantity + delta)
+    )
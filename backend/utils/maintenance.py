@@ -0,0 +1,138 @@
+# backend/utils/maintenance.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, or_, select
+
+from backend.extensions import db
+from backend.models import Cart, CartItem, IdempotencyKey, Order, OTPVerification, PaymentWebhookEvent
+from backend.utils.idempotency import KEY_RETENTION
+from backend.utils.inventory_service import release_expired_reservations
+from backend.utils.payment_webhooks import EVENT_RETENTION
+
+# ====== Maintenance sweep ======
+# Expired OTPs, abandoned carts, old idempotency keys and processed
+# webhook events are deleted in
+# bounded chunks: select up to CHUNK_SIZE ids, delete them, commit, repeat.
+# Each transaction touches a few hundred rows, so locks are short and the
+# sweep can run next to live traffic. Run it with `flask sweep`, or set MAINTENANCE_INTERVAL_SECONDS to
+# run it from a background thread in every app process.
+
+CHUNK_SIZE = 500
+CART_ABANDON_DAYS = 30
+OTP_RETENTION = timedelta(hours=1)  # keep expired codes briefly for support lookups
+
+
+def _delete_in_chunks(id_column, conditions, delete_chunk, chunk_size, pause):
+    # walks forward by id, so rows that survive a chunk are never re-selected
+    removed, last_id = 0, 0
+    while True:
+        stmt = select(id_column).where(*conditions, id_column > last_id).order_by(id_column).limit(chunk_size)
+        ids = [row[0] for row in db.session.execute(stmt)]
+        if not ids:
+            return removed
+        removed += delete_chunk(ids)
+        db.session.commit()
+        if len(ids) < chunk_size:
+            return removed
+        last_id = ids[-1]
+        if pause:
+            time.sleep(pause)
+
+
+def sweep_expired_otps(now=None, chunk_size=CHUNK_SIZE, pause=0):
+    """Delete OTP rows that expired more than OTP_RETENTION ago."""
+    cutoff = (now or datetime.utcnow()) - OTP_RETENTION
+
+    def delete_chunk(ids):
+        return db.session.execute(delete(OTPVerification).where(OTPVerification.id.in_(ids))).rowcount
+
+    return _delete_in_chunks(
+        OTPVerification.id, (OTPVerification.expires_at < cutoff,), delete_chunk, chunk_size, pause
+    )
+
+
+def sweep_abandoned_carts(days=CART_ABANDON_DAYS, now=None, chunk_size=CHUNK_SIZE, pause=0):
+    """Delete active carts untouched for ``days`` that no order refers to."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    recently_touched = exists().where(CartItem.cart_id == Cart.cart_id, CartItem.updated_at >= cutoff)
+    ordered = exists().where(Order.cart_id == Cart.cart_id)
+    abandoned = (Cart.status == "active", Cart.created_at < cutoff, ~recently_touched, ~ordered)
+
+    def delete_chunk(ids):
+        # conditions are re-checked so a cart touched since the SELECT survives
+        stale = or_(CartItem.updated_at < cutoff, CartItem.updated_at.is_(None))
+        db.session.execute(delete(CartItem).where(CartItem.cart_id.in_(ids), stale))
+        has_items = exists().where(CartItem.cart_id == Cart.cart_id)
+        stmt = delete(Cart).where(Cart.cart_id.in_(ids), *abandoned, ~has_items)
+        return db.session.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+    return _delete_in_chunks(Cart.cart_id, abandoned, delete_chunk, chunk_size, pause)
+
+
+def purge_idempotency_keys(now=None, chunk_size=CHUNK_SIZE, pause=0):
+    """Delete stored idempotency keys older than KEY_RETENTION."""
+    cutoff = (now or datetime.utcnow()) - KEY_RETENTION
+
+    def delete_chunk(ids):
+        return db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids))).rowcount
+
+    return _delete_in_chunks(
+        IdempotencyKey.id, (IdempotencyKey.created_at < cutoff,), delete_chunk, chunk_size, pause
+    )
+
+
+def purge_webhook_events(now=None, chunk_size=CHUNK_SIZE, pause=0):
+    """Delete webhook events processed more than EVENT_RETENTION ago."""
+    cutoff = (now or datetime.utcnow()) - EVENT_RETENTION
+
+    def delete_chunk(ids):
+        return db.session.execute(delete(PaymentWebhookEvent).where(PaymentWebhookEvent.id.in_(ids))).rowcount
+
+    return _delete_in_chunks(
+        PaymentWebhookEvent.id, (PaymentWebhookEvent.processed_at < cutoff,), delete_chunk, chunk_size, pause
+    )
+
+
+MAINTENANCE_TASKS = [
+    ("expired_otps", sweep_expired_otps),
+    ("abandoned_carts", sweep_abandoned_carts),
+    ("expired_reservations", release_expired_reservations),
+    ("idempotency_keys", purge_idempotency_keys),
+    ("webhook_events", purge_webhook_events),
+]
+
+
+def run_maintenance(chunk_size=CHUNK_SIZE, pause=0):
+    """Run every sweep task; returns ``[(task, rows_removed, seconds), ...]``."""
+    report = []
+    for name, task in MAINTENANCE_TASKS:
+        started = time.monotonic()
+        removed = task(chunk_size=chunk_size, pause=pause)
+        report.append((name, removed, time.monotonic() - started))
+    return report
+
+
+def _maintenance_loop(app, interval):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                for name, removed, seconds in run_maintenance(pause=0.05):
+                    app.logger.info("maintenance %s: removed %d rows in %.2fs", name, removed, seconds)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("maintenance sweep failed")
+            finally:
+                db.session.remove()
+
+
+def init_maintenance(app):
+    """Start the background sweep when MAINTENANCE_INTERVAL_SECONDS is set (> 0)."""
+    interval = app.config.get("MAINTENANCE_INTERVAL_SECONDS") or 0
+    if interval <= 0 or app.extensions.get("maintenance_thread"):
+        return
+    thread = threading.Thread(target=_maintenance_loop, args=(app, interval), daemon=True)
+    app.extensions["maintenance_thread"] = thread
+    thread.start()
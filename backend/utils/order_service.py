@@ -0,0 +1,135 @@
+# backend/utils/order_service.py
+from datetime import datetime
+
+from sqlalchemy import Numeric, cast, exists, func, insert, literal, select, update
+
+from backend.extensions import db
+from backend.models import Cart, CartItem, Order, OrderItem, Product
+from backend.utils.inventory_service import release_reservations
+
+# ====== Cart -> order materialization ======
+# A checkout is a fixed handful of statements whatever the cart size:
+#   INSERT the order (flush for its id)
+#   INSERT INTO order_item ... SELECT from cart_item JOIN product
+#   one aggregate for the order total and item count
+#   UPDATE cart SET status = 'ordered' WHERE status = 'active'
+# and the caller commits once, so an order can never be half written. The
+# conditional status flip also makes two concurrent checkouts of the same
+# cart collide: the loser gets CartConflict and rolls back.
+# The payment-gateway order is created only after that commit
+# (attach_gateway_order), so no inventory row stays locked for the HTTP
+# round trip; the stock hold it leaves is TTL-bounded either way.
+
+
+class EmptyCart(Exception):
+    pass
+
+
+class CartConflict(Exception):
+    """The cart was checked out (or changed status) by a concurrent request."""
+
+
+def materialize_order(cart_id, user_id, **order_fields):
+    """Turn an active cart into an Order with its OrderItems. Caller commits.
+
+    Unit prices are copied from the product table inside the same
+    statement that copies the lines. Raises EmptyCart or CartConflict;
+    the caller must roll back in both cases.
+    """
+    order = Order(user_id=user_id, cart_id=cart_id, total_amt=0, created_at=datetime.utcnow(), **order_fields)
+    db.session.add(order)
+    db.session.flush()
+
+    lines = (
+        select(literal(order.order_id), CartItem.product_id, CartItem.quantity, Product.price)
+        .join(Product, Product.product_id == CartItem.product_id)
+        .where(CartItem.cart_id == cart_id)
+    )
+    db.session.execute(
+        insert(OrderItem.__table__).from_select(["order_id", "product_id", "quantity", "unit_price"], lines)
+    )
+
+    count, total, units = db.session.execute(
+        select(
+            func.count(),
+            # typed Numeric(10, 2) so SQLite's float SUM comes back as an exact Decimal
+            cast(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0), Numeric(10, 2)),
+            func.coalesce(func.sum(OrderItem.quantity), 0),
+        )
+        .where(OrderItem.order_id == order.order_id)
+    ).one()
+    if not count:
+        raise EmptyCart("cart is empty")
+    order.total_amt = total
+    order.item_count = units  # denormalized so order lists never touch order_item
+
+    flipped = db.session.execute(
+        update(Cart.__table__)
+        .where(Cart.__table__.c.cart_id == cart_id, Cart.__table__.c.status == "active")
+        .values(status="ordered")
+    ).rowcount
+    if flipped != 1:
+        raise CartConflict(f"cart {cart_id} is no longer active")
+    return order
+
+
+def order_quantities(order_id):
+    """``{product_id: quantity}`` of an order, for stock reservation."""
+    rows = db.session.execute(
+        select(OrderItem.product_id, OrderItem.quantity).where(OrderItem.order_id == order_id)
+    )
+    return {product_id: quantity for product_id, quantity in rows}
+
+
+def abandon_order(order_id):
+    """Undo a checkout whose gateway order could not be created. Caller commits.
+
+    Cancels the order if it is still pending, gives back its stock hold and
+    reopens its cart unless the user already has another active one.
+    """
+    order_id, cart_id, user_id = db.session.execute(
+        select(Order.order_id, Order.cart_id, Order.user_id).where(Order.order_id == order_id)
+    ).one()
+    cancelled = db.session.execute(
+        update(Order)
+        .where(Order.order_id == order_id, Order.order_status == "pending")
+        .values(order_status="cancelled")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        return
+    release_reservations(order_id)
+    if cart_id is not None:
+        carts = Cart.__table__
+        other = carts.alias("other_cart")
+        other_active = exists().where(other.c.user_id == user_id, other.c.status == "active")
+        db.session.execute(
+            update(carts)
+            .where(carts.c.cart_id == cart_id, carts.c.status == "ordered", ~other_active)
+            .values(status="active")
+        )
+
+
+def attach_gateway_order(order_id, create_gateway_order):
+    """Create the gateway order for a committed pending order and store its id. Commits.
+
+    ``create_gateway_order()`` (the Razorpay call) runs with no transaction
+    open; its id is saved in a second short one. If it raises, the order is
+    abandoned and the exception re-raised.
+    """
+    db.session.commit()
+    try:
+        gateway_order = create_gateway_order()
+    except Exception:
+        db.session.rollback()
+        abandon_order(order_id)
+        db.session.commit()
+        raise
+    db.session.execute(
+        update(Order)
+        .where(Order.order_id == order_id)
+        .values(razorpay_order_id=gateway_order["id"])
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return gateway_order
@@ -0,0 +1,123 @@
+# backend/utils/otp_mailer.py
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from sqlalchemy import update
+
+from backend.extensions import db
+from backend.models import OTPVerification
+
+load_dotenv()
+
+# ====== OTP email queue ======
+# /resend-otp used to call the Resend API inline, so every request held a
+# worker for the whole remote round trip (with no timeout at all). Now the
+# route commits the OTP row and hands the email to a small thread pool:
+#   - one pooled requests Session (keep-alive) shared by the workers;
+#   - a (connect, read) timeout on every call;
+#   - up to MAX_ATTEMPTS tries with jittered exponential backoff on
+#     connection errors, timeouts, 429 and 5xx; other 4xx fail at once;
+#   - the outcome lands in OTPVerification.delivery_status / delivery_attempts.
+# RESEND_API_URL points the worker at a local stub (scripts/resend_stub.py).
+
+RESEND_API_KEY = os.getenv("RESEND_API_KEY")
+RESEND_API_URL = os.getenv("RESEND_API_URL", "https://api.resend.com/emails")
+RESEND_FROM = os.getenv("RESEND_FROM", "Resend <onboarding@resend.dev>")
+
+TIMEOUT = (3.05, 10)
+WORKERS = int(os.getenv("OTP_MAIL_WORKERS", "4"))
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5  # seconds; doubles per attempt
+
+_executor = None
+_session = None
+_lock = threading.Lock()
+
+
+class PermanentDeliveryError(Exception):
+    """The API rejected the email; retrying the same request won't help."""
+
+
+def _pool():
+    global _executor, _session
+    with _lock:
+        if _executor is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=WORKERS, pool_maxsize=WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="otp-mail")
+        return _executor, _session
+
+
+def mailer_configured():
+    return bool(RESEND_API_KEY)
+
+
+def send_otp_email(to_email, otp, session=None):
+    """One delivery attempt. Raises PermanentDeliveryError or a requests exception."""
+    response = (session or requests).post(
+        RESEND_API_URL,
+        headers={"Authorization": f"Bearer {RESEND_API_KEY}", "Content-Type": "application/json"},
+        json={
+            "from": RESEND_FROM,
+            "to": [to_email],
+            "subject": "Your OTP Code",
+            "html": f"<h2>Your OTP is {otp}</h2><p>This code will expire in 5 minutes.</p>",
+        },
+        timeout=TIMEOUT,
+    )
+    if 400 <= response.status_code < 500 and response.status_code != 429:
+        raise PermanentDeliveryError(f"{response.status_code}: {response.text[:200]}")
+    response.raise_for_status()
+
+
+def _record(otp_id, **values):
+    if otp_id is None:
+        return
+    db.session.execute(update(OTPVerification).where(OTPVerification.id == otp_id).values(**values))
+    db.session.commit()
+
+
+def _deliver(app, otp_id, to_email, otp, session):
+    with app.app_context():
+        try:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                _record(otp_id, delivery_attempts=attempt)
+                try:
+                    send_otp_email(to_email, otp, session)
+                except PermanentDeliveryError as e:
+                    app.logger.warning("OTP email to %s rejected: %s", to_email, e)
+                    break
+                except requests.RequestException as e:
+                    app.logger.info("OTP email to %s failed (attempt %d): %s", to_email, attempt, e)
+                    if attempt < MAX_ATTEMPTS:
+                        time.sleep(BACKOFF_BASE * 2 ** (attempt - 1) * (0.5 + random.random()))
+                    continue
+                _record(otp_id, delivery_status="sent")
+                return True
+            _record(otp_id, delivery_status="failed")
+            return False
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("OTP email worker crashed")
+            return False
+        finally:
+            db.session.remove()
+
+
+def enqueue_otp_email(to_email, otp, otp_id=None):
+    """Send in the background; returns the Future (True once delivered).
+
+    ``otp_id`` is the committed OTPVerification row whose delivery columns
+    the worker keeps up to date.
+    """
+    executor, session = _pool()
+    return executor.submit(_deliver, current_app._get_current_object(), otp_id, to_email, otp, session)
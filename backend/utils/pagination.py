@@ -0,0 +1,132 @@
+# backend/utils/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import text, tuple_
+
+from backend.extensions import db
+
+# ====== Keyset (cursor) pagination ======
+# Instead of OFFSET + COUNT(*), each page remembers the sort key of its last
+# row in an opaque ``after`` token and the next page starts with
+# ``WHERE (key) > (:last)``. With an index on the key, page N costs the same
+# as page 1. Going back works the same way from the first row's key in a
+# ``before`` token: ``WHERE (key) < (:first)`` in reverse order, flipped.
+
+
+def encode_cursor(values):
+    """Pack the last row's key values into an opaque URL-safe token."""
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Unpack a token from encode_cursor; returns None if missing or malformed."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(payload, list):
+        return None
+    try:
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def estimate_row_count(table_name):
+    """Planner row estimate for a whole table (Postgres only, else None)."""
+    bind = db.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    estimate = db.session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+        {"name": table_name},
+    ).scalar()
+    return int(estimate) if estimate is not None and estimate >= 0 else None
+
+
+class KeysetPage:
+    """One page of a keyset-paginated query."""
+
+    def __init__(self, items, per_page, next_cursor=None, total=None, after=None, prev_cursor=None, before=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.after = after
+        self.before = before
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    @property
+    def is_first(self):
+        if self.before:
+            return self.prev_cursor is None
+        return not self.after
+
+
+def keyset_paginate(query, columns, after=None, per_page=20, descending=False, count=None, before=None):
+    """Return a KeysetPage of ``query`` ordered by ``columns``.
+
+    ``columns`` must uniquely identify a row (end with the primary key).
+    ``before`` (a page's ``prev_cursor``) pages backwards and wins over ``after``.
+    ``count`` is ``None`` (no total), ``"exact"`` (COUNT(*), opt-in) or
+    ``"estimate"`` (planner estimate of the unfiltered table).
+    """
+    total = None
+    if count == "exact":
+        total = query.order_by(None).count()
+    elif count == "estimate":
+        total = estimate_row_count(columns[-1].table.name)
+
+    key = decode_cursor(before)
+    backward = key is not None and len(key) == len(columns)
+    if not backward:
+        before = None
+        key = decode_cursor(after)
+    keyed = key is not None and len(key) == len(columns)
+    reverse = descending != backward  # scan order of this query
+    if keyed:
+        if len(columns) == 1:
+            cmp_left, cmp_right = columns[0], key[0]
+        else:
+            cmp_left, cmp_right = tuple_(*columns), tuple_(*key)
+        query = query.filter(cmp_left < cmp_right if reverse else cmp_left > cmp_right)
+
+    ordering = [c.desc() for c in columns] if reverse else [c.asc() for c in columns]
+    rows = query.order_by(None).order_by(*ordering).limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backward:
+        rows.reverse()
+
+    def cursor_of(row):
+        return encode_cursor([getattr(row, c.key) for c in columns])
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if backward:
+            next_cursor = cursor_of(rows[-1])
+            prev_cursor = cursor_of(rows[0]) if more else None
+        else:
+            next_cursor = cursor_of(rows[-1]) if more else None
+            prev_cursor = cursor_of(rows[0]) if keyed else None
+
+    return KeysetPage(
+        rows, per_page, next_cursor=next_cursor, total=total, after=after,
+        prev_cursor=prev_cursor, before=before,
+    )
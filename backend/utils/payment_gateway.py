@@ -0,0 +1,176 @@
+# backend/utils/payment_gateway.py
+import os
+import threading
+import time
+from collections import deque
+
+import razorpay
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
+
+# ====== Razorpay gateway client ======
+# One razorpay.Client per process, shared by every blueprint. Its requests
+# Session keeps a keep-alive connection pool and puts every call through:
+#   - a (connect, read) timeout, so a slow gateway can't pin a worker;
+#   - bounded retries with jittered backoff on *connect* failures only
+#     (the request never reached Razorpay, so retrying a POST is safe);
+#   - a circuit breaker: after CB_FAILURE_THRESHOLD consecutive failures
+#     (errors, timeouts, 5xx) calls fail fast with GatewayUnavailable for
+#     CB_RESET_SECONDS, then a single trial call decides whether to close;
+#   - latency/error counters, see gateway_stats().
+# RAZORPAY_BASE_URL points the client at a local stub (scripts/razorpay_stub.py).
+
+RAZORPAY_KEY = os.getenv("RAZORPAY_KEY")
+RAZORPAY_SECRET = os.getenv("RAZORPAY_SECRET")
+if not RAZORPAY_KEY or not RAZORPAY_SECRET:
+    # no baked-in credentials: refuse to start rather than fall back to a shared key
+    raise RuntimeError("RAZORPAY_KEY and RAZORPAY_SECRET must be set (environment or .env)")
+RAZORPAY_WEBHOOK_SECRET = os.getenv("RAZORPAY_WEBHOOK_SECRET", "")
+RAZORPAY_BASE_URL = os.getenv("RAZORPAY_BASE_URL", razorpay.Client.DEFAULTS["base_url"])
+
+CONNECT_TIMEOUT = float(os.getenv("RAZORPAY_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("RAZORPAY_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("RAZORPAY_POOL_SIZE", "10"))
+CONNECT_RETRIES = 2
+CB_FAILURE_THRESHOLD = 5
+CB_RESET_SECONDS = 30
+LATENCY_WINDOW = 512
+
+
+class GatewayUnavailable(Exception):
+    """Raised without a network call while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=CB_FAILURE_THRESHOLD, reset_seconds=CB_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial_in_flight):
+                raise GatewayUnavailable("payment gateway circuit is open")
+            if state == "half-open":
+                self._trial_in_flight = True
+
+    def record(self, success):
+        with self._lock:
+            self._trial_in_flight = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()  # (re)open; a failed trial restarts the wait
+
+
+class LatencyStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.calls += 1
+            self.errors += 0 if ok else 1
+            self._samples.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            calls, errors, rejected = self.calls, self.errors, self.rejected
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1) if samples else None
+
+        return {
+            "calls": calls,
+            "errors": errors,
+            "rejected": rejected,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(samples[-1] * 1000, 1) if samples else None,
+        }
+
+
+class GatewaySession(requests.Session):
+    """requests Session with default timeouts, breaker and latency accounting."""
+
+    def __init__(self, breaker, stats, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), pool_size=POOL_SIZE):
+        super().__init__()
+        self.breaker = breaker
+        self.stats = stats
+        self.timeout = timeout
+        retry = Retry(
+            total=CONNECT_RETRIES,
+            connect=CONNECT_RETRIES,
+            read=False,  # never resend once the request may have reached Razorpay
+            status=0,
+            other=0,
+            allowed_methods=None,  # connect errors are safe to retry for any method
+            backoff_factor=0.2,
+            backoff_jitter=0.1,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            self.breaker.before_call()
+        except GatewayUnavailable:
+            self.stats.reject()
+            raise
+
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = super().request(method, url, **kwargs)
+            ok = response.status_code < 500
+            return response
+        finally:
+            self.stats.record(time.perf_counter() - started, ok)
+            self.breaker.record(ok)
+
+
+breaker = CircuitBreaker()
+stats = LatencyStats()
+
+
+def build_client(key=RAZORPAY_KEY, secret=RAZORPAY_SECRET, base_url=RAZORPAY_BASE_URL, **session_options):
+    session = GatewaySession(breaker, stats, **session_options)
+    return razorpay.Client(session=session, auth=(key, secret), base_url=base_url)
+
+
+razorpay_client = build_client()
+
+
+def gateway_stats():
+    return {"circuit": breaker.state, "failures": breaker.failures, **stats.snapshot()}
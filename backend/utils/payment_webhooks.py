@@ -0,0 +1,192 @@
+# backend/utils/payment_webhooks.py
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.models import Order, PaymentWebhookEvent
+from backend.utils.inventory_service import OutOfStock, confirm_order_stock
+from backend.utils.product_cache import invalidate_product
+
+# ====== Razorpay webhook queue ======
+# POST /payment/webhook only verifies the signature, appends the raw event
+# to payment_webhook_event and answers 200, so a burst of payments costs
+# request workers one INSERT each. Events are applied later, in batches:
+#   SELECT up to BATCH_SIZE queued events (SKIP LOCKED on Postgres)
+#   lock the batch's pending orders and confirm each one's stock
+#   one UPDATE orders SET order_status = 'paid' for those fully confirmed,
+#   one to 'payment_review' for those whose hold expired and sold out
+#   one UPDATE marking the batch processed, one commit
+# Razorpay redelivers until it gets a 2xx, so the same event can arrive
+# more than once: the unique event_id drops repeats at INSERT, and only
+# pending orders are moved to paid, so replays and the browser callback
+# (payment_routes.verify_payment) never apply a payment twice.
+# Failed payments leave the order pending; the customer can retry and
+# held stock expires with the maintenance sweep.
+# Drain with `flask webhooks-drain` (cron), or set
+# WEBHOOK_DRAIN_INTERVAL_SECONDS on the web server to poll in-process.
+
+BATCH_SIZE = 500
+EVENT_RETENTION = timedelta(days=7)
+PAID_EVENTS = {"payment.captured", "order.paid"}
+
+_DIALECT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def enqueue_webhook_event(body, event_id=None):
+    """Store a verified webhook body. Caller commits; returns False for a repeat.
+
+    ``event_id`` is Razorpay's x-razorpay-event-id header; without it the
+    body hash stands in, which still dedupes byte-identical redeliveries.
+    Raises ValueError if the body is not a JSON event.
+    """
+    event = json.loads(body)
+    if not isinstance(event, dict) or not event.get("event"):
+        raise ValueError("not a Razorpay event")
+    row = {
+        "event_id": (event_id or hashlib.sha256(body.encode()).hexdigest())[:64],
+        "event_type": str(event["event"])[:64],
+        "payload": body,
+        "received_at": datetime.utcnow(),
+    }
+
+    insert = _DIALECT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(PaymentWebhookEvent(**row))
+        except IntegrityError:
+            return False
+        return True
+    stmt = insert(PaymentWebhookEvent.__table__).values(**row).on_conflict_do_nothing(index_elements=["event_id"])
+    return db.session.execute(stmt).rowcount == 1
+
+
+def _razorpay_order_id(event):
+    entities = event.get("payload") or {}
+    if "order" in entities:
+        return (entities["order"].get("entity") or {}).get("id")
+    if "payment" in entities:
+        return (entities["payment"].get("entity") or {}).get("order_id")
+    return None
+
+
+def _apply_batch(rows):
+    """Apply one batch of ``(id, event_type, payload)`` rows.
+
+    Returns ``(orders_paid, product_ids_sold)``.
+    """
+    paid = set()
+    for _, event_type, payload in rows:
+        if event_type not in PAID_EVENTS:
+            continue
+        try:
+            razorpay_order_id = _razorpay_order_id(json.loads(payload))
+        except (ValueError, AttributeError):
+            continue  # malformed payloads are marked processed and kept for inspection
+        if razorpay_order_id:
+            paid.add(razorpay_order_id)
+    if not paid:
+        return 0, set()
+
+    # locked, so verify_payment's pending -> paid claim waits for this batch
+    order_ids = db.session.execute(
+        select(Order.order_id)
+        .where(Order.razorpay_order_id.in_(paid), Order.order_status == "pending")
+        .with_for_update()
+    ).scalars().all()
+
+    confirmed, review, sold = [], [], set()
+    for order_id in order_ids:
+        try:
+            sold.update(confirm_order_stock(order_id))  # held stock becomes a sale
+            confirmed.append(order_id)
+        except OutOfStock:
+            review.append(order_id)  # paid after the hold expired and the stock sold: refund
+    for status, ids in (("paid", confirmed), ("payment_review", review)):
+        if ids:
+            db.session.execute(
+                update(Order)
+                .where(Order.order_id.in_(ids), Order.order_status == "pending")
+                .values(order_status=status)
+                .execution_options(synchronize_session=False)
+            )
+    return len(confirmed), sold
+
+
+def drain_webhook_events(chunk_size=BATCH_SIZE, pause=0):
+    """Apply queued webhook events in batches of ``chunk_size``, one commit each.
+
+    Returns ``(events_processed, orders_paid)``.
+    """
+    processed = paid = 0
+    while True:
+        query = (
+            select(PaymentWebhookEvent.id, PaymentWebhookEvent.event_type, PaymentWebhookEvent.payload)
+            .where(PaymentWebhookEvent.processed_at.is_(None))
+            .order_by(PaymentWebhookEvent.id)
+            .limit(chunk_size)
+        )
+        if db.session.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)  # parallel drainers take disjoint batches
+        rows = db.session.execute(query).all()
+        if not rows:
+            return processed, paid
+
+        orders_paid, sold = _apply_batch(rows)
+        db.session.execute(
+            update(PaymentWebhookEvent)
+            .where(PaymentWebhookEvent.id.in_([row[0] for row in rows]))
+            .values(processed_at=datetime.utcnow())
+        )
+        db.session.commit()
+        paid += orders_paid
+        for product_id in sold:
+            invalidate_product(product_id)
+        processed += len(rows)
+        if len(rows) < chunk_size:
+            return processed, paid
+        if pause:
+            time.sleep(pause)
+
+
+# ====== Background drainer ======
+_wakeup = threading.Event()
+
+
+def notify_webhook_worker():
+    """Wake this process's drainer now instead of at its next poll."""
+    _wakeup.set()
+
+
+def _webhook_loop(app, interval):
+    while True:
+        _wakeup.wait(interval)
+        _wakeup.clear()
+        with app.app_context():
+            try:
+                processed, paid = drain_webhook_events()
+                if processed:
+                    app.logger.info("webhooks: processed %d events, %d orders paid", processed, paid)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("webhook drain failed")
+            finally:
+                db.session.remove()
+
+
+def init_webhook_worker(app):
+    """Start the background drainer when WEBHOOK_DRAIN_INTERVAL_SECONDS is set (> 0)."""
+    interval = app.config.get("WEBHOOK_DRAIN_INTERVAL_SECONDS") or 0
+    if interval <= 0 or app.extensions.get("webhook_thread"):
+        return
+    thread = threading.Thread(target=_webhook_loop, args=(app, interval), daemon=True)
+    app.extensions["webhook_thread"] = thread
+    thread.start()
@@ -0,0 +1,67 @@
+# backend/utils/product_cache.py
+from collections import namedtuple
+
+from flask import abort
+
+from backend.extensions import db
+from backend.models import Product
+from backend.utils.cache import TTLCache
+
+# ====== Read-through product cache ======
+# Storefront pages only read a handful of product columns, so they get an
+# immutable ProductRecord from a per-worker LRU instead of a fresh
+# SELECT (and a session-bound ORM object) on every request. Use the ORM
+# model directly whenever the product is going to be modified.
+
+ProductRecord = namedtuple(
+    "ProductRecord",
+    [
+        "product_id", "name", "category", "price", "stock_qty", "description",
+        "image", "image_key", "created_at", "updated_at",
+    ],
+)
+
+_product_cache = TTLCache(maxsize=4096, ttl=120)
+
+
+def _to_record(product):
+    return ProductRecord(
+        product_id=product.product_id,
+        name=product.name,
+        category=product.category,
+        price=product.price,
+        stock_qty=product.stock_qty,
+        description=product.description,
+        image=product.image,
+        image_key=product.image_key,
+        created_at=product.created_at,
+        updated_at=product.updated_at,
+    )
+
+
+def get_product_record(product_id):
+    """Cached ProductRecord for ``product_id``, or None if it does not exist."""
+    record = _product_cache.get(product_id)
+    if record is None:
+        product = db.session.get(Product, product_id)
+        if product is None:
+            return None
+        record = _to_record(product)
+        _product_cache.set(product_id, record)
+    return record
+
+
+def get_product_record_or_404(product_id):
+    record = get_product_record(product_id)
+    if record is None:
+        abort(404)
+    return record
+
+
+def invalidate_product(product_id):
+    """Drop a product after its price/stock/details change (call after commit)."""
+    _product_cache.pop(product_id)
+
+
+def product_cache_stats():
+    return _product_cache.stats()
@@ -0,0 +1,128 @@
+# backend/utils/related.py
+from collections import defaultdict
+
+from sqlalchemy import delete, insert
+
+from backend.extensions import db
+from backend.models import Product, RelatedProduct
+
+# ====== Related products index ======
+# Neighbours are products in the same category with the closest price. Each
+# category is sorted once by price and every product takes its k nearest by
+# walking outwards from its own position, so a full rebuild is
+# O(n log n + n*k) with no per-product queries.
+
+RELATED_LIMIT = 4
+_INSERT_CHUNK = 5000
+
+
+def _nearest(items, i, k):
+    """k nearest-by-price neighbours of ``items[i]`` in a price-sorted list."""
+    price = items[i][1]
+    lo, hi = i - 1, i + 1
+    picks = []
+    while len(picks) < k and (lo >= 0 or hi < len(items)):
+        left = price - items[lo][1] if lo >= 0 else None
+        right = items[hi][1] - price if hi < len(items) else None
+        if right is None or (left is not None and left <= right):
+            picks.append((items[lo][0], left))
+            lo -= 1
+        else:
+            picks.append((items[hi][0], right))
+            hi += 1
+    return picks
+
+
+def _rows_for(items, indexes, k):
+    for i in indexes:
+        for rank, (related_id, distance) in enumerate(_nearest(items, i, k)):
+            yield {
+                "product_id": items[i][0],
+                "rank": rank,
+                "related_id": related_id,
+                "score": float(distance),
+            }
+
+
+def _insert_rows(rows):
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= _INSERT_CHUNK:
+            db.session.execute(insert(RelatedProduct), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(RelatedProduct), chunk)
+        count += len(chunk)
+    return count
+
+
+def _sorted_category(category):
+    return (
+        db.session.query(Product.product_id, Product.price)
+        .filter(Product.category == category)
+        .order_by(Product.price, Product.product_id)
+        .all()
+    )
+
+
+def rebuild_related_products(categories=None, k=RELATED_LIMIT):
+    """Recompute neighbours for every product (or only ``categories``).
+
+    Pass both the old and the new category after a product is moved so the
+    products that pointed at it are refreshed too. Caller commits.
+    """
+    query = db.session.query(Product.product_id, Product.category, Product.price).filter(
+        Product.category.isnot(None)
+    )
+    if categories:
+        query = query.filter(Product.category.in_(categories))
+
+    by_category = defaultdict(list)
+    for product_id, category, price in query.yield_per(_INSERT_CHUNK):
+        by_category[category].append((product_id, price or 0))
+
+    if categories:
+        scope = db.session.query(Product.product_id).filter(Product.category.in_(categories))
+        db.session.execute(delete(RelatedProduct).where(RelatedProduct.product_id.in_(scope.scalar_subquery())))
+    else:
+        db.session.execute(delete(RelatedProduct))
+
+    def rows():
+        for items in by_category.values():
+            items.sort(key=lambda r: (r[1], r[0]))
+            yield from _rows_for(items, range(len(items)), k)
+
+    return _insert_rows(rows())
+
+
+def refresh_related_for(product, k=RELATED_LIMIT):
+    """Incrementally index a newly added product.
+
+    Only products within ``k`` positions of it in its category's price order
+    can gain it as a neighbour, so just that window is recomputed. Caller commits.
+    """
+    if not product.category:
+        return 0
+    items = [(pid, price or 0) for pid, price in _sorted_category(product.category)]
+    position = next((i for i, (pid, _) in enumerate(items) if pid == product.product_id), None)
+    if position is None:
+        return 0
+
+    window = range(max(0, position - k), min(len(items), position + k + 1))
+    affected = [items[i][0] for i in window]
+    db.session.execute(delete(RelatedProduct).where(RelatedProduct.product_id.in_(affected)))
+    return _insert_rows(_rows_for(items, window, k))
+
+
+def related_products_for(product, limit=RELATED_LIMIT):
+    """Precomputed neighbours of ``product`` in rank order (one indexed lookup)."""
+    return (
+        Product.query.join(RelatedProduct, RelatedProduct.related_id == Product.product_id)
+        .filter(RelatedProduct.product_id == product.product_id)
+        .order_by(RelatedProduct.rank)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,135 @@
+# backend/utils/search.py
+import re
+
+from sqlalchemy import column, literal_column, table, text
+
+from backend.extensions import db
+from backend.models import Product
+
+# ====== Full-text product search ======
+# Postgres keeps a weighted tsvector as a stored generated column with a GIN
+# index on it; SQLite uses an external-content FTS5 table kept in sync by
+# triggers. Either way inserts/updates from the admin routes and bulk imports
+# are indexed by the database itself, no application hooks needed.
+
+SEARCH_CONFIG = "english"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_fts = table("product_fts", column("rowid"), column("rank"))
+
+POSTGRES_DDL = [
+    f"""
+    ALTER TABLE product ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+        name, category, description,
+        content='product', content_rowid='product_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts(rowid, name, category, description)
+        VALUES (new.product_id, new.name, new.category, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, category, description)
+        VALUES ('delete', old.product_id, old.name, old.category, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE OF name, category, description ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, category, description)
+        VALUES ('delete', old.product_id, old.name, old.category, old.description);
+        INSERT INTO product_fts(rowid, name, category, description)
+        VALUES (new.product_id, new.name, new.category, new.description);
+    END
+    """,
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS product_fts_au",
+    "DROP TRIGGER IF EXISTS product_fts_ad",
+    "DROP TRIGGER IF EXISTS product_fts_ai",
+    "DROP TABLE IF EXISTS product_fts",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_product_search_vector",
+    "ALTER TABLE product DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_index(connection, rebuild=False):
+    """Create the search index for the connection's dialect (idempotent)."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for ddl in POSTGRES_DDL:
+            connection.execute(text(ddl))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'product_fts'")
+        ).first()
+        for ddl in SQLITE_DDL:
+            connection.execute(text(ddl))
+        if rebuild or not exists:
+            # Re-read every row from the content table (first setup or forced).
+            connection.execute(text("INSERT INTO product_fts(product_fts) VALUES ('rebuild')"))
+
+
+def drop_search_index(connection):
+    """Remove the search index objects created by create_search_index."""
+    dialect = connection.dialect.name
+    statements = {"postgresql": POSTGRES_DROP, "sqlite": SQLITE_DROP}.get(dialect, [])
+    for ddl in statements:
+        connection.execute(text(ddl))
+
+
+def search_tokens(search_query):
+    """Split user input into lowercase word tokens (safe to embed in MATCH/tsquery)."""
+    return _TOKEN_RE.findall((search_query or "").lower())
+
+
+def apply_product_search(query, search_query):
+    """Filter a Product query by full-text match, ordered by relevance.
+
+    Every token is treated as a prefix so partial words still match
+    (``"hik boo"`` finds "Durable Hiking Boots").
+    """
+    tokens = search_tokens(search_query)
+    if not tokens:
+        return query
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in tokens)
+        return (
+            query.join(_fts, _fts.c.rowid == Product.product_id)
+            .filter(literal_column("product_fts").op("MATCH")(match))
+            .order_by(_fts.c.rank)
+        )
+
+    if dialect == "postgresql":
+        vector = literal_column("product.search_vector")
+        tsquery = db.func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{t}:*" for t in tokens))
+        return (
+            query.filter(vector.op("@@")(tsquery))
+            .order_by(db.func.ts_rank_cd(vector, tsquery).desc(), Product.product_id)
+        )
+
+    # Unknown backend: plain substring match, no ranking.
+    for token in tokens:
+        query = query.filter(Product.name.ilike(f"%{token}%"))
+    return query
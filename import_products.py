@@ -7,13 +7,14 @@ with app.app_context():
     with open('product.csv', newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
+            # name/category/description feed the search index (kept in sync by the DB)
             product = Product(
-                title=row['title'],
+                name=row['title'],
                 description=row['description'],
                 price=float(row['price']),
                 category=row['category'],
-                image_url=row['image_url'],  # fixed here
-                stock=int(row['stock'])
+                image=row['image_url'],
+                stock_qty=int(row['stock'])
             )
             db.session.add(product)
         db.session.commit()
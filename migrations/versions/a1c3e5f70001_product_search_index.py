@@ -0,0 +1,25 @@
+"""product full-text search index
+
+Revision ID: a1c3e5f70001
+Revises: 61f03f4f5242
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+from backend.utils.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70001'
+down_revision = '61f03f4f5242'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_search_index(op.get_bind(), rebuild=True)
+
+
+def downgrade():
+    drop_search_index(op.get_bind())
@@ -0,0 +1,33 @@
+"""related_product index table
+
+Revision ID: a1c3e5f70002
+Revises: a1c3e5f70001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70002'
+down_revision = 'a1c3e5f70001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populate afterwards with `flask related-rebuild`.
+    op.create_table('related_product',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.product_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['related_id'], ['product.product_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'rank')
+    )
+
+
+def downgrade():
+    op.drop_table('related_product')
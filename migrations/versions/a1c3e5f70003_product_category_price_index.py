@@ -0,0 +1,23 @@
+"""product (category, price) index
+
+Revision ID: a1c3e5f70003
+Revises: a1c3e5f70002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70003'
+down_revision = 'a1c3e5f70002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_product_category_price', 'product', ['category', 'price'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_product_category_price', table_name='product')
@@ -0,0 +1,29 @@
+"""product.updated_at for catalog cache validators
+
+Revision ID: a1c3e5f70004
+Revises: a1c3e5f70003
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70004'
+down_revision = 'a1c3e5f70003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE product SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.create_index('ix_product_updated_at', 'product', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_product_updated_at', table_name='product')
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
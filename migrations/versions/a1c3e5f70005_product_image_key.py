@@ -0,0 +1,26 @@
+"""product.image_key for ingested thumbnails
+
+Revision ID: a1c3e5f70005
+Revises: a1c3e5f70004
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70005'
+down_revision = 'a1c3e5f70004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_key', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('image_key')
@@ -0,0 +1,40 @@
+"""unique (cart_id, product_id) on cart_item
+
+Revision ID: a1c3e5f70006
+Revises: a1c3e5f70005
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70006'
+down_revision = 'a1c3e5f70005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # fold duplicate lines into the oldest row before adding the constraint
+    op.execute("""
+        UPDATE cart_item SET quantity = (
+            SELECT SUM(dup.quantity) FROM cart_item dup
+            WHERE dup.cart_id = cart_item.cart_id AND dup.product_id = cart_item.product_id
+        )
+        WHERE item_id IN (
+            SELECT MIN(item_id) FROM cart_item GROUP BY cart_id, product_id HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM cart_item WHERE item_id NOT IN (
+            SELECT MIN(item_id) FROM cart_item GROUP BY cart_id, product_id
+        )
+    """)
+    with op.batch_alter_table('cart_item', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_cart_item_cart_product', ['cart_id', 'product_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('cart_item', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_cart_item_cart_product', type_='unique')
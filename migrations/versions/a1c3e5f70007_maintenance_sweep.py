@@ -0,0 +1,34 @@
+"""cart_item.updated_at and indexes for the maintenance sweep
+
+Revision ID: a1c3e5f70007
+Revises: a1c3e5f70006
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70007'
+down_revision = 'a1c3e5f70006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cart_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # existing lines count as touched when their cart was created
+    op.execute(
+        "UPDATE cart_item SET updated_at = (SELECT cart.created_at FROM cart WHERE cart.cart_id = cart_item.cart_id)"
+    )
+    op.create_index('ix_cart_status_created', 'cart', ['status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_otp_verification_expires_at'), 'otp_verification', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_otp_verification_expires_at'), table_name='otp_verification')
+    op.drop_index('ix_cart_status_created', table_name='cart')
+    with op.batch_alter_table('cart_item', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,58 @@
+"""stock_reservation table and one inventory row per product
+
+Revision ID: a1c3e5f70008
+Revises: a1c3e5f70007
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70008'
+down_revision = 'a1c3e5f70007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # fold duplicate inventory rows into the oldest one before adding the constraint
+    op.execute("""
+        UPDATE inventory SET
+            stock_quantity = (SELECT SUM(dup.stock_quantity) FROM inventory dup WHERE dup.product_id = inventory.product_id),
+            reserved_stock = (SELECT SUM(dup.reserved_stock) FROM inventory dup WHERE dup.product_id = inventory.product_id)
+        WHERE inventory_id IN (
+            SELECT MIN(inventory_id) FROM inventory GROUP BY product_id HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM inventory WHERE inventory_id NOT IN (
+            SELECT MIN(inventory_id) FROM inventory GROUP BY product_id
+        )
+    """)
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_inventory_product', ['product_id'])
+
+    op.create_table('stock_reservation',
+    sa.Column('reservation_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.order_id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['product.product_id'], ),
+    sa.PrimaryKeyConstraint('reservation_id')
+    )
+    op.create_index(op.f('ix_stock_reservation_order_id'), 'stock_reservation', ['order_id'], unique=False)
+    op.create_index('ix_stock_reservation_status_expires', 'stock_reservation', ['status', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_stock_reservation_status_expires', table_name='stock_reservation')
+    op.drop_index(op.f('ix_stock_reservation_order_id'), table_name='stock_reservation')
+    op.drop_table('stock_reservation')
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_inventory_product', type_='unique')
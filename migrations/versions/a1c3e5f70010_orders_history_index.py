@@ -0,0 +1,33 @@
+"""orders.item_count and (user_id, created_at, order_id) history index
+
+Revision ID: a1c3e5f70010
+Revises: a1c3e5f70009
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70010'
+down_revision = 'a1c3e5f70009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE orders SET item_count = COALESCE(
+            (SELECT SUM(order_item.quantity) FROM order_item WHERE order_item.order_id = orders.order_id), 0
+        )
+    """)
+    op.create_index('ix_orders_user_created', 'orders', ['user_id', 'created_at', 'order_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_orders_user_created', table_name='orders')
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('item_count')
@@ -0,0 +1,26 @@
+"""orders (created_at) and (order_status, created_at) indexes for the admin console
+
+Revision ID: a1c3e5f70011
+Revises: a1c3e5f70010
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70011'
+down_revision = 'a1c3e5f70010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_orders_created', 'orders', ['created_at', 'order_id'], unique=False)
+    op.create_index('ix_orders_status_created', 'orders', ['order_status', 'created_at', 'order_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_orders_status_created', table_name='orders')
+    op.drop_index('ix_orders_created', table_name='orders')
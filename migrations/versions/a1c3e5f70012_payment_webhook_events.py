@@ -0,0 +1,39 @@
+"""payment_webhook_event queue table and orders.razorpay_order_id index
+
+Revision ID: a1c3e5f70012
+Revises: a1c3e5f70011
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70012'
+down_revision = 'a1c3e5f70011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payment_webhook_event',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('event_id', sa.String(length=64), nullable=False),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id')
+    )
+    op.create_index(op.f('ix_payment_webhook_event_processed_at'), 'payment_webhook_event', ['processed_at'], unique=False)
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_razorpay_order_id'), ['razorpay_order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_razorpay_order_id'))
+    op.drop_index(op.f('ix_payment_webhook_event_processed_at'), table_name='payment_webhook_event')
+    op.drop_table('payment_webhook_event')
@@ -0,0 +1,28 @@
+"""otp_verification delivery_status / delivery_attempts for the email queue
+
+Revision ID: a1c3e5f70013
+Revises: a1c3e5f70012
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70013'
+down_revision = 'a1c3e5f70012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('otp_verification', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('delivery_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('delivery_attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('otp_verification', schema=None) as batch_op:
+        batch_op.drop_column('delivery_attempts')
+        batch_op.drop_column('delivery_status')
@@ -1,6 +1,9 @@
 from backend.app import app, db
+from backend.utils.search import create_search_index
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        with db.engine.begin() as conn:
+            create_search_index(conn)
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,109 @@
+# scripts/bench_reservations.py
+"""Contention benchmark for the stock reservation engine.
+
+N threads race to check out one hot SKU; each attempt is a real checkout
+transaction (order row + conditional inventory UPDATE + reservation row,
+one commit). Afterwards the script checks that exactly `--stock` units
+were reserved - never more - and prints throughput.
+
+    python scripts/bench_reservations.py --threads 16 --stock 500
+    DATABASE_URL=postgresql://... python scripts/bench_reservations.py
+
+Without DATABASE_URL a throwaway SQLite file is used; SQLite serialises
+writers, so use Postgres to see real row-level contention.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--stock", type=int, default=500, help="Units of the hot SKU on hand.")
+    parser.add_argument("--quantity", type=int, default=1, help="Units per checkout.")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}?timeout=30"
+
+    from sqlalchemy.exc import OperationalError
+
+    from backend.app import create_app
+    from backend.extensions import db
+    from backend.models import Inventory, Order, Product, StockReservation, User
+    from backend.utils.inventory_service import OutOfStock, reserve_stock
+
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", email=f"bench-{time.time()}@example.com", password="x")
+        product = Product(name="Hot SKU", category="Bench", price=1, stock_qty=args.stock)
+        db.session.add_all([user, product])
+        db.session.commit()
+        user_id, product_id = user.userid, product.product_id
+
+    counts = {"reserved": 0, "rejected": 0, "retried": 0}
+    lock = threading.Lock()
+    start = threading.Barrier(args.threads)
+
+    def worker():
+        with app.app_context():
+            start.wait()
+            while True:
+                try:
+                    order = Order(user_id=user_id, total_amt=1, order_status="pending")
+                    db.session.add(order)
+                    db.session.flush()
+                    reserve_stock(order.order_id, {product_id: args.quantity})
+                    db.session.commit()
+                    outcome = "reserved"
+                except OutOfStock:
+                    db.session.rollback()
+                    outcome = "rejected"
+                except OperationalError:  # SQLite "database is locked": try again
+                    db.session.rollback()
+                    outcome = "retried"
+                with lock:
+                    counts[outcome] += 1
+                if outcome == "rejected":
+                    return
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    with app.app_context():
+        inventory = Inventory.query.filter_by(product_id=product_id).one()
+        held = db.session.query(db.func.coalesce(db.func.sum(StockReservation.quantity), 0)).filter_by(
+            product_id=product_id
+        ).scalar()
+        backend = db.engine.url.get_backend_name()
+
+    expected = (args.stock // args.quantity) * args.quantity
+    print(f"database      {backend}")
+    print(f"threads       {args.threads}")
+    print(f"checkouts     {counts['reserved']} reserved, {counts['rejected']} rejected, {counts['retried']} retried")
+    print(f"reserved      {inventory.reserved_stock} of {inventory.stock_quantity} units ({held} in reservations)")
+    print(f"elapsed       {elapsed:.2f}s  ({counts['reserved'] / elapsed:.0f} reservations/s)")
+
+    oversold = inventory.reserved_stock > inventory.stock_quantity or held != inventory.reserved_stock
+    if oversold or inventory.reserved_stock != expected:
+        print("❌ reservation totals do not match stock")
+        sys.exit(1)
+    print("✅ no overselling")
+
+
+if __name__ == "__main__":
+    main()
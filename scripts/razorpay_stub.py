@@ -0,0 +1,72 @@
+# scripts/razorpay_stub.py
+"""Minimal local stand-in for the Razorpay orders API.
+
+    python scripts/razorpay_stub.py --port 8765 [--delay 0.2] [--fail-rate 0.1]
+    RAZORPAY_BASE_URL=http://127.0.0.1:8765 flask run
+
+Answers POST /v1/orders with a fake order id after `--delay` seconds, and
+with a 500 for a `--fail-rate` fraction of calls, so the gateway client's
+timeouts, retries and circuit breaker can be exercised without network.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(delay, fail_rate):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real gateway
+        disable_nagle_algorithm = True
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(delay)
+            if not self.path.rstrip("/").endswith("/orders"):
+                self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "not found"}})
+            elif random.random() < fail_rate:
+                self._reply(500, {"error": {"code": "SERVER_ERROR", "description": "stub failure"}})
+            else:
+                self._reply(200, {
+                    "id": f"order_{uuid.uuid4().hex[:14]}",
+                    "entity": "order",
+                    "amount": data.get("amount"),
+                    "currency": data.get("currency", "INR"),
+                    "receipt": data.get("receipt"),
+                    "status": "created",
+                })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8765, delay=0.0, fail_rate=0.0, background=False):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay, fail_rate))
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Razorpay stub on http://127.0.0.1:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of calls answered with 500.")
+    args = parser.parse_args()
+    serve(args.port, args.delay, args.fail_rate)
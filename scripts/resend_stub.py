@@ -0,0 +1,70 @@
+# scripts/resend_stub.py
+"""Minimal local stand-in for the Resend email API.
+
+    python scripts/resend_stub.py --port 8766 [--delay 0.5] [--fail-rate 0.3]
+    RESEND_API_URL=http://127.0.0.1:8766/emails RESEND_API_KEY=test flask run
+
+Answers POST /emails with a fake email id after `--delay` seconds, and with
+a 503 for a `--fail-rate` fraction of calls, so the OTP mail queue's
+timeouts, retries and delivery status can be exercised without network.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(delay, fail_rate, received):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(delay)
+            if not self.path.rstrip("/").endswith("/emails"):
+                self._reply(404, {"name": "not_found", "message": "not found"})
+            elif not self.headers.get("Authorization", "").startswith("Bearer "):
+                self._reply(401, {"name": "missing_api_key", "message": "missing API key"})
+            elif random.random() < fail_rate:
+                self._reply(503, {"name": "internal_server_error", "message": "stub failure"})
+            else:
+                received.append(data)
+                self._reply(200, {"id": str(uuid.uuid4())})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8766, delay=0.0, fail_rate=0.0, background=False):
+    """Start the stub; returns ``(server, received_emails)`` when ``background``."""
+    received = []
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay, fail_rate, received))
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, received
+    print(f"Resend stub on http://127.0.0.1:{server.server_port}/emails")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of calls answered with 503.")
+    args = parser.parse_args()
+    serve(args.port, args.delay, args.fail_rate)
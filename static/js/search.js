@@ -0,0 +1,39 @@
+// Search-as-you-type suggestions for the product search box
+document.addEventListener("DOMContentLoaded", () => {
+    const input = document.querySelector("input[data-suggest-url]");
+    const list = document.getElementById("search-suggestions");
+    if (!input || !list) return;
+
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener("input", () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const q = input.value.trim();
+            if (!q) {
+                list.innerHTML = "";
+                return;
+            }
+
+            // Drop the previous in-flight request, only the latest prefix matters
+            if (controller) controller.abort();
+            controller = new AbortController();
+
+            try {
+                const url = `${input.dataset.suggestUrl}?q=${encodeURIComponent(q)}`;
+                const res = await fetch(url, { signal: controller.signal });
+                const data = await res.json();
+
+                list.innerHTML = "";
+                data.suggestions.forEach((s) => {
+                    const option = document.createElement("option");
+                    option.value = s.label;
+                    list.appendChild(option);
+                });
+            } catch (err) {
+                if (err.name !== "AbortError") console.error("Suggest failed:", err);
+            }
+        }, 80);
+    });
+});
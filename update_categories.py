@@ -1,6 +1,8 @@
 import random
 from backend.app import app, db
 from backend.models import Product  # Make sure this points to your Product model
+from backend.utils.facets import invalidate_category_facets
+from backend.utils.related import rebuild_related_products
 
 # List of categories you want to assign
 categories = [
@@ -21,10 +23,15 @@ def update_product_categories():
             old_category = product.category
             new_category = random.choice(categories)
             product.category = new_category
-            print(f"Updated '{product.title}': {old_category} -> {new_category}")
+            print(f"Updated '{product.name}': {old_category} -> {new_category}")
 
         # Commit changes
         db.session.commit()
+        # Every product may have moved, so recompute the related-products index
+        rebuild_related_products()
+        db.session.commit()
+        # Only clears this process; running workers pick it up when their facet TTL expires
+        invalidate_category_facets()
         print(f"✅ Updated {len(products)} products with random categories.")
 
 if __name__ == "__main__":